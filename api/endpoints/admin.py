@@ -1,10 +1,12 @@
-from typing import Annotated, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query
+from fastapi.responses import StreamingResponse
 from pydantic import Field 
-from fastapi import APIRouter, Depends, HTTPException, status
-from models.user import UserCreate, UserPublic, UserRole,UserUpdate
-from services.repositories.user_repo import UserRepository
-from services.repositories.user_repo import UserRepository 
+from models.user import UserCreate, UserPublic, UserRole,UserUpdate, UserPage
+from models.user import BulkUserCreate, BulkUserUpdate, BulkUserDelete, BulkResult
+from services.repositories.user_repo import UserRepository, to_public
+from api.pagination import encode_cursor, decode_cursor
 from security.auth import (
     get_current_active_admin, # The dependency to ensure the user is an admin
     get_user_repo_dependency # The dependency to inject the UserRepository
@@ -16,11 +18,108 @@ router = APIRouter(
     dependencies=[Depends(get_current_active_admin)] 
 )
 
-@router.get("/", response_model=List[UserPublic], summary="List all users")
+MAX_PAGE_SIZE = 500
+SortField = Literal["created_at", "email"]
+
+
+CURSOR_VALUE_PARSERS = {"created_at": datetime.fromisoformat, "email": str}
+
+
+def user_filters(
+    role: Optional[UserRole] = None,
+    account_type: Optional[Literal['individual', 'corporate']] = None,
+    country: Optional[str] = None,
+    email_prefix: Annotated[Optional[str], Query(description="Case-sensitive email prefix")] = None,
+    created_after: Annotated[Optional[datetime], Query(description="Inclusive (UTC)")] = None,
+    created_before: Annotated[Optional[datetime], Query(description="Exclusive (UTC)")] = None,
+) -> dict:
+    return {
+        "role": role.value if role else None,
+        "account_type": account_type,
+        "country": country,
+        "email_prefix": email_prefix,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+
+
+@router.get("/", response_model=UserPage, summary="List users (paginated)")
 async def list_users(
+    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)],
+    filters: Annotated[dict, Depends(user_filters)],
+    sort: SortField = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 100,
+    cursor: Annotated[Optional[str], Query(description="next_cursor from the previous page")] = None,
+):
+    """
+    One page of users. Pass `next_cursor` back as `cursor`, with the same filters
+    and sort, to get the next page.
+    """
+    docs = await user_repo.get_users_page(
+        limit,
+        sort=sort,
+        ascending=order == "asc",
+        after=decode_cursor(cursor, CURSOR_VALUE_PARSERS[sort]) if cursor else None,
+        **filters,
+    )
+    next_cursor = None
+    if len(docs) == limit:
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(sort), last["_id"])
+    items = [user for user in map(to_public, docs) if user is not None]
+    return UserPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export", summary="Export users as NDJSON")
+async def export_users(
+    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)],
+    filters: Annotated[dict, Depends(user_filters)],
+    sort: SortField = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+):
+    """Streams every matching user as one JSON object per line, without buffering the result."""
+    async def lines():
+        async for doc in user_repo.iter_users(sort=sort, ascending=order == "asc", **filters):
+            user = to_public(doc)
+            if user is not None:
+                yield user.model_dump_json(by_alias=True) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
+
+
+# --- BULK OPERATIONS (one unordered bulk_write per request, a result per item) ---
+def _bulk_result(results: List[dict]) -> BulkResult:
+    failed = sum(1 for r in results if r["status"] == "error")
+    return BulkResult(succeeded=len(results) - failed, failed=failed, results=results)
+
+
+@router.post("/bulk", response_model=BulkResult, summary="Create users in bulk")
+async def bulk_create_users(
+    payload: BulkUserCreate,
+    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)]
+):
+    return _bulk_result(await user_repo.bulk_create_users(payload.users, role=payload.role.value))
+
+
+@router.patch("/bulk", response_model=BulkResult, summary="Update users in bulk")
+async def bulk_update_users(
+    payload: BulkUserUpdate,
+    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)]
+):
+    return _bulk_result(await user_repo.bulk_update_users(payload.users))
+
+
+@router.post("/bulk/delete", response_model=BulkResult, summary="Delete users in bulk")
+async def bulk_delete_users(
+    payload: BulkUserDelete,
     user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)]
 ):
-    return await user_repo.get_all_users()
+    return _bulk_result(await user_repo.bulk_delete_users(payload.ids))
 
 
 @router.get("/{user_id}", response_model=UserPublic, summary="Get user by ID")
@@ -5,7 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from models.user import UserCreate, UserPublic, UserRole 
 from services.repositories.user_repo import UserRepository 
 from security.auth import (
-    verify_password, 
+    verify_password_async,
     create_access_token,
     get_user_repo_dependency 
 )
@@ -40,7 +40,7 @@ async def login_for_access_token(
     # Use the injected user_repo object
     user_doc = await user_repo.get_user_by_email(form_data.username) 
     
-    if not user_doc or not verify_password(form_data.password, user_doc.hashed_password):
+    if not user_doc or not await verify_password_async(form_data.password, user_doc.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from motor.motor_asyncio import AsyncIOMotorClient
+from core.database import get_mongo_client
+from api.pagination import encode_cursor, decode_cursor
+from config.settings import settings
+from models.price import PricePoint, PriceHistoryPage, CandlePoint, RecentTick, Sparkline, AnalyticsResult
+from services.analytics import INDICATORS, PriceAnalyticsService
+from services.dependencies import get_price_repo, get_candle_repo, get_analytics_service
+from services.repositories.price_repo import PriceRepository
+from services.repositories.candle_repo import CandleRepository
+from services.tick_buffer import tick_buffer
+
+MAX_PAGE_SIZE = 1000
+
+router = APIRouter(prefix="/prices", tags=["Prices"])
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query datetimes may carry an offset (`...Z`); stored timestamps are naive UTC."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("/history", response_model=PriceHistoryPage, summary="Paginated price history")
+async def get_price_history(
+    price_repo: Annotated[PriceRepository, Depends(get_price_repo)],
+    mongo_client: Annotated[AsyncIOMotorClient, Depends(get_mongo_client)],
+    start: Annotated[Optional[datetime], Query(description="Inclusive lower bound (UTC)")] = None,
+    end: Annotated[Optional[datetime], Query(description="Exclusive upper bound (UTC)")] = None,
+    source: Optional[str] = None,
+    symbol: Optional[str] = None,
+    order: Literal["asc", "desc"] = "desc",
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 200,
+    cursor: Annotated[Optional[str], Query(description="next_cursor from the previous page")] = None,
+):
+    """Returns ticks in time order. Pass `next_cursor` back as `cursor` to get the next page."""
+    after = decode_cursor(cursor, datetime.fromisoformat) if cursor else None
+    docs = await price_repo.get_price_history(
+        mongo_client,
+        limit=limit,
+        start=start,
+        end=end,
+        source=source,
+        symbol=symbol,
+        after=after,
+        ascending=order == "asc",
+    )
+
+    next_cursor = None
+    if len(docs) == limit:
+        last = docs[-1]
+        next_cursor = encode_cursor(last["timestamp"], last["_id"])
+
+    items = [PricePoint(**{**doc, "_id": str(doc["_id"])}) for doc in docs]
+    return PriceHistoryPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/candles", response_model=List[CandlePoint], summary="OHLC candles")
+async def get_candles(
+    request: Request,
+    candle_repo: Annotated[CandleRepository, Depends(get_candle_repo)],
+    mongo_client: Annotated[AsyncIOMotorClient, Depends(get_mongo_client)],
+    interval: Literal["1m", "5m", "1h", "1d"] = "1m",
+    source: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 300,
+):
+    """Closed candles from the candle collection plus the live, still-open bucket."""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    docs = await candle_repo.get_candles(
+        mongo_client, interval, limit, source=source, start=start, end=end
+    )
+    candles = {(d["source"], d["start"]): CandlePoint(**d) for d in docs}
+
+    rollup = getattr(request.app.state, "candle_rollup", None)
+    if rollup is not None:
+        for live in rollup.open_candles(interval, source):
+            if (start is None or live["start"] >= start) and (end is None or live["start"] < end):
+                candles[(live["source"], live["start"])] = CandlePoint(**live, closed=False)
+
+    ordered = sorted(candles.values(), key=lambda c: c.start)
+    return ordered[-limit:]
+
+
+@router.get("/recent", response_model=List[RecentTick], summary="Most recent ticks (in memory)")
+async def get_recent_prices(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 100,
+    source: Optional[str] = None,
+):
+    """Served from the in-process tick buffer; no database access."""
+    return tick_buffer.last(limit, source)
+
+
+@router.get("/sparkline", response_model=Sparkline, summary="Downsampled recent prices (in memory)")
+async def get_sparkline(
+    window_seconds: Annotated[int, Query(ge=60, le=86400)] = 3600,
+    points: Annotated[int, Query(ge=2, le=1000)] = 120,
+    source: Optional[str] = None,
+):
+    since = datetime.utcnow() - timedelta(seconds=window_seconds)
+    return Sparkline(
+        window_seconds=window_seconds,
+        source=source,
+        prices=tick_buffer.sparkline(since, points, source),
+    )
+
+
+@router.get("/analytics", response_model=AnalyticsResult, summary="Technical indicators over a price window")
+async def get_price_analytics(
+    analytics: Annotated[PriceAnalyticsService, Depends(get_analytics_service)],
+    mongo_client: Annotated[AsyncIOMotorClient, Depends(get_mongo_client)],
+    indicators: Annotated[str, Query(description="Comma-separated: " + ",".join(INDICATORS))] = "sma,ema",
+    window: Annotated[int, Query(ge=2, le=5000)] = 20,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    source: Optional[str] = None,
+):
+    """SMA/EMA, rolling volatility, rate of change and min/max bands, aligned with the series."""
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    requested = [name.strip() for name in indicators.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in INDICATORS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown indicators: {', '.join(unknown)}",
+        )
+
+    # Open-ended ranges are snapped to the cache TTL so concurrent callers share a result
+    if end is None:
+        step = max(1, settings.ANALYTICS_CACHE_TTL_SECONDS)
+        now = datetime.utcnow().replace(microsecond=0)
+        seconds_of_day = now.hour * 3600 + now.minute * 60 + now.second
+        end = now - timedelta(seconds=seconds_of_day % step) + timedelta(seconds=step)
+    if start is None:
+        start = end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+
+    return await analytics.analyze(mongo_client, start, end, requested, window, source=source)
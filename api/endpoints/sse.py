@@ -0,0 +1,24 @@
+# api/endpoints/sse.py
+
+from typing import Annotated, Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from services.sse_hub import sse_hub
+
+router = APIRouter(tags=["Streaming"])
+
+@router.get("/sse/gold_price", summary="Server-Sent Events price stream")
+async def sse_gold_price(
+    request: Request,
+    last_event_id: Annotated[Optional[str], Header(alias="Last-Event-ID")] = None,
+):
+    """Same ticks as /ws/gold_price over plain HTTP. Reconnects resume from Last-Event-ID."""
+    return StreamingResponse(
+        sse_hub.stream(last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -0,0 +1,37 @@
+# api/endpoints/stats.py
+
+from typing import Any, Dict
+from fastapi import APIRouter, Depends, Query, Request
+from security.auth import get_current_active_admin, password_pool, principal_cache
+from services.sse_hub import sse_hub
+from services.websocket_manager import manager as ws_manager
+
+router = APIRouter(
+    prefix="/admin/stats",
+    tags=["Admin"],
+    dependencies=[Depends(get_current_active_admin)]
+)
+
+
+@router.get("", summary="Runtime counters of this process")
+async def get_stats(
+    request: Request,
+    clients: bool = Query(False, description="Include lag and queue counters for every WebSocket client"),
+) -> Dict[str, Any]:
+    """Point-in-time counters for the process that serves the request (each worker has its own)."""
+    stats: Dict[str, Any] = {
+        "websocket": ws_manager.stats(per_client=clients),
+        "sse": {"subscribers": len(sse_hub.subscribers)},
+        "auth": {
+            "password_pool": password_pool.stats(),
+            "principal_cache": principal_cache.stats(),
+        },
+    }
+    scraper = getattr(request.app.state, "scraper", None)
+    supervisor = getattr(request.app.state, "scraper_supervisor", None)
+    if scraper:
+        stats["scraper"] = scraper.stats()
+    elif supervisor:
+        # The scraper runs in the child; its counters are in the child's periodic log line
+        stats["scraper"] = {"process": supervisor.stats()}
+    return stats
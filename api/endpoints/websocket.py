@@ -21,9 +21,11 @@
 
 # api/endpoints/websocket.py
 
-from fastapi import APIRouter, WebSocket
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
-from services.websocket_manager import manager
+import time
+from config.settings import settings
+from services.websocket_manager import manager, encode_frame
 
 router = APIRouter()
 
@@ -31,14 +33,33 @@ router = APIRouter()
 async def websocket_endpoint(ws: WebSocket):
     # 1. Connect client
     await manager.connect(ws)
-    print("New WebSocket client connected")
+    client = manager.clients.get(ws)
 
     try:
-        while True:
-            # 2. Keep connection alive (idle)
-            await asyncio.sleep(10)
+        while client is not None and not client.closed:
+            # 2. Read control messages. Clients that never speak the protocol just get every
+            #    tick; once a client sends anything it must keep answering pings.
+            try:
+                raw = await asyncio.wait_for(ws.receive_text(), timeout=settings.WS_PING_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                if client.uses_protocol:
+                    if time.monotonic() - client.last_seen > settings.WS_IDLE_TIMEOUT_SECONDS:
+                        print("Closing idle WebSocket client (no pong).")
+                        break
+                    client.enqueue(encode_frame({"type": "ping"}))
+                continue
+
+            client.last_seen = time.monotonic()
+            reply = client.handle_message(raw)
+            if reply:
+                client.enqueue(encode_frame(reply))
+            if reply.get("type") == "subscription" and manager.last_tick \
+                    and client.wants(manager.last_tick.data):
+                client.enqueue_tick(manager.last_tick)
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         print(f"WebSocket disconnected: {e}")
     finally:
         # 3. Remove client when disconnected
-        manager.disconnect(ws)
+        await manager.evict(ws)
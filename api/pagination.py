@@ -0,0 +1,27 @@
+import base64
+from datetime import datetime
+from typing import Any, Callable, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+
+def encode_cursor(value: Any, doc_id: ObjectId) -> str:
+    """
+    Opaque keyset cursor for the (sort value, _id) of a page's last row. A row
+    without the sort value gives an _id-only cursor.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = f"{'' if value is None else value}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parse_value: Callable[[str], Any] = str) -> Tuple[Any, ObjectId]:
+    """(sort value, _id) from encode_cursor(); the value is None for an _id-only cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        # _id never contains '|', so split from the right (emails may)
+        value, doc_id = base64.urlsafe_b64decode(padded).decode().rsplit("|", 1)
+        return (parse_value(value) if value else None), ObjectId(doc_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -0,0 +1,61 @@
+# benchmarks/history_explain.py
+#
+# Prints the winning plan for a deep /prices/history keyset page, unfiltered and
+# per source. Each page should be an IXSCAN on the (…, timestamp, _id) indexes
+# with no SORT stage and keysExamined close to the page size.
+#
+#   API_KEY=x SECRET_KEY=x MONGO_URI=mongodb://localhost:27017 python -m benchmarks.history_explain [--source goldprice]
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+from config.settings import settings  # noqa: E402
+from core.database import ensure_price_collection  # noqa: E402
+from services.repositories.price_repo import PriceRepository  # noqa: E402
+
+
+def stages(plan):
+    """Stage names from the root of a winning plan down to its leaf."""
+    while plan:
+        yield plan.get("stage"), plan.get("indexName")
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+
+
+async def explain_page(repo, client, limit, **filters):
+    # A cursor taken from the middle of the collection, like a client deep into paging
+    first = await repo.get_price_history(client, limit=limit, **filters)
+    after = (first[-1]["timestamp"], first[-1]["_id"]) if first else None
+    plan = await repo.explain_price_history(client, limit, after=after, **filters)
+    winning = plan["queryPlanner"]["winningPlan"]
+    execution = plan.get("executionStats", {})
+    label = json.dumps(filters) if filters else "all sources"
+    print(f"{label}:")
+    for stage, index in stages(winning.get("queryPlan", winning)):
+        print(f"    {stage}{f' ({index})' if index else ''}")
+    if execution:
+        print(f"    keysExamined={execution.get('totalKeysExamined')} docsExamined={execution.get('totalDocsExamined')}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--source", default=None)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    await ensure_price_collection(client)
+    repo = PriceRepository()
+    await explain_page(repo, client, args.limit)
+    if args.source:
+        await explain_page(repo, client, args.limit, source=args.source)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
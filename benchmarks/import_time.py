@@ -0,0 +1,74 @@
+# benchmarks/import_time.py
+#
+# Cold import cost of the API app, measured with `python -X importtime`. Fails
+# (exit 1) when `import main` exceeds the budget or when an API-only process
+# (RUN_SCRAPER=false) pulls in a scraper backend, so startup regressions show up
+# before they reach a scale-to-zero deploy.
+#
+#   python -m benchmarks.import_time [--budget-ms 1500] [--runs 3] [--top 12]
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must never be imported by an API-only process
+SCRAPER_MODULES = ("playwright", "selenium", "webdriver_manager", "requests", "greenlet")
+
+
+def measure(env) -> dict:
+    """Module -> (self µs, cumulative µs, depth) for one fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import main failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=3, help="best of N cold starts")
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    env = {**os.environ, "RUN_SCRAPER": "false"}
+    for name in ("API_KEY", "MONGO_URI", "SECRET_KEY"):
+        env.setdefault(name, "import-time-benchmark")
+
+    runs = [measure(env) for _ in range(args.runs)]
+    best = min(runs, key=lambda modules: modules["main"][1])
+    total_ms = best["main"][1] / 1000
+
+    direct = sorted(
+        ((cumulative, name) for name, (_, cumulative, depth) in best.items() if depth == 1),
+        reverse=True,
+    )
+    print(f"import main: {total_ms:.0f} ms (best of {args.runs}), budget {args.budget_ms:.0f} ms")
+    for cumulative, name in direct[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.0f} ms (> {args.budget_ms:.0f} ms)")
+    leaked = sorted({name.split(".")[0] for name in best} & set(SCRAPER_MODULES))
+    if leaked:
+        failures.append(f"API-only startup imported scraper backends: {', '.join(leaked)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/login_storm.py
+#
+# Login throughput and tick latency during a burst of logins, with bcrypt run
+# inline on the event loop (the old handlers) versus on the password pool.
+# A 100 ms "tick" task stands in for the scraper/WebSocket loop; its lateness
+# is how long price delivery would stall.
+#
+#   API_KEY=x MONGO_URI=mongodb://x SECRET_KEY=x python -m benchmarks.login_storm [--logins 40]
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from security.auth import get_password_hash, password_pool, verify_password, verify_password_async  # noqa: E402
+
+TICK_INTERVAL = 0.1
+
+
+async def ticker(lateness, stop: asyncio.Event):
+    while not stop.is_set():
+        due = time.perf_counter() + TICK_INTERVAL
+        await asyncio.sleep(TICK_INTERVAL)
+        lateness.append(max(0.0, time.perf_counter() - due))
+
+
+async def inline_login(password, hashed):
+    return verify_password(password, hashed)
+
+
+async def attempt(login, hashed: str):
+    """True/False for a verified login, None when the pool turned it away with a 503."""
+    try:
+        return await login("correct horse battery", hashed)
+    except HTTPException as e:
+        if e.status_code != 503:
+            raise
+        return None
+
+
+async def storm(login, logins: int, hashed: str):
+    lateness = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lateness, stop))
+    await asyncio.sleep(TICK_INTERVAL * 2)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(attempt(login, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+    accepted = [r for r in results if r is not None]
+    assert all(accepted)
+    lateness_ms = sorted(x * 1000 for x in lateness)
+    return {
+        "logins_per_s": len(accepted) / elapsed,
+        "rejected": len(results) - len(accepted),
+        "tick_p50_ms": statistics.median(lateness_ms),
+        "tick_p99_ms": lateness_ms[int(0.99 * (len(lateness_ms) - 1))],
+        "tick_max_ms": lateness_ms[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    args = parser.parse_args()
+
+    hashed = get_password_hash("correct horse battery")
+    print(f"{args.logins} concurrent logins, {password_pool.workers} pool workers, ticker every {TICK_INTERVAL * 1000:.0f} ms")
+    print(f"{'mode':<8}{'logins/s':>10}{'rejected':>10}{'tick p50':>10}{'tick p99':>10}{'tick max':>10}   (lateness, ms)")
+    for name, login in (("inline", inline_login), ("pool", verify_password_async)):
+        r = await storm(login, args.logins, hashed)
+        print(f"{name:<8}{r['logins_per_s']:>10.1f}{r['rejected']:>10}{r['tick_p50_ms']:>10.1f}{r['tick_p99_ms']:>10.1f}{r['tick_max_ms']:>10.1f}")
+    print("pool stats:", password_pool.stats())
+    password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
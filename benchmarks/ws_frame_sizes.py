@@ -0,0 +1,79 @@
+# benchmarks/ws_frame_sizes.py
+#
+# Bytes per tick on the wire for each WebSocket tick encoding, with and without
+# permessage-deflate (emulated with zlib the way RFC 7692 frames it: raw deflate,
+# sync flush, trailing 00 00 ff ff stripped, context kept across messages).
+#
+#   python -m benchmarks.ws_frame_sizes [--ticks 10000]
+
+import argparse
+import os
+import random
+import sys
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings() requires these; this benchmark never reaches Mongo or the API
+for name in ("API_KEY", "MONGO_URI", "SECRET_KEY"):
+    os.environ.setdefault(name, "unused")
+
+from services.change_detector import parse_price  # noqa: E402
+from services.frame_codec import ENCODINGS, Tick, decode  # noqa: E402
+
+
+def synthetic_ticks(count: int):
+    rng = random.Random(42)
+    price = 2650.00
+    now = datetime(2025, 1, 6, 14, 30)
+    for i in range(count):
+        price = round(price + rng.choice((-1, 1)) * rng.random() * 0.8, 2)
+        now += timedelta(milliseconds=rng.randint(4000, 12000))
+        source = "GOLDAPI" if i % 5 == 0 else "FAILOVER"
+        yield {"price": f"{price:,.2f}", "source": source, "symbol": "XAU", "timestamp": now.isoformat()}
+
+
+class Deflate:
+    def __init__(self):
+        self.compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+
+    def size(self, payload: bytes) -> int:
+        out = self.compressor.compress(payload) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return len(out[:-4] if out.endswith(b"\x00\x00\xff\xff") else out)
+
+
+def measure(encoding: str, ticks) -> tuple:
+    stream_ids = {}
+    bases, state = {}, {}
+    deflate = Deflate()
+    raw = compressed = 0
+    for data in ticks:
+        key = (data["source"], data["symbol"])
+        tick = Tick(data, stream_ids.setdefault(key, len(stream_ids)))
+        if encoding == "json":
+            payload = tick.frame.encode()
+        else:
+            payload = tick.encode(encoding, bases.get(tick.stream_id))
+            bases[tick.stream_id] = tick.state
+            decoded = decode(encoding, payload, state)
+            assert abs(decoded["price"] - parse_price(data["price"])) < 1e-9, (decoded, data)
+        raw += len(payload)
+        compressed += deflate.size(payload)
+    return raw / len(ticks), compressed / len(ticks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticks", type=int, default=10_000)
+    args = parser.parse_args()
+
+    ticks = list(synthetic_ticks(args.ticks))
+    print(f"{args.ticks} ticks, 2 sources")
+    print(f"{'encoding':<10}{'bytes/tick':>12}{'+deflate':>12}")
+    for encoding in ENCODINGS:
+        raw, compressed = measure(encoding, ticks)
+        print(f"{encoding:<10}{raw:>12.1f}{compressed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict 
-from typing import Optional
+from typing import Optional, List
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8')
@@ -10,18 +10,122 @@ class Settings(BaseSettings):
     # --- MongoDB Settings ---
     MONGO_DB: str = "price_db"
     MONGO_COLLECTION: str = "scraped_data"
+    PRICE_TIMESERIES: bool = True          # create MONGO_COLLECTION as a time-series collection
+    PRICE_TIMESERIES_GRANULARITY: str = "seconds"
+    PRICE_RETENTION_DAYS: Optional[int] = None  # expire raw ticks after this many days
+    TICK_BUFFER_CAPACITY: int = 43200      # in-memory recent ticks (24h at one tick per 2s)
+    TICK_BUFFER_SECONDS: int = 86400       # how far back the buffer is seeded from Mongo at startup
+    ANALYTICS_MAX_POINTS: int = 200000     # newest ticks loaded per analytics window
+    ANALYTICS_CACHE_ENTRIES: int = 64
+    ANALYTICS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # per cache (series and results), as NumPy arrays
+    ANALYTICS_CACHE_TTL_SECONDS: int = 30  # for windows that reach the present
+    CANDLES_ENABLED: bool = True           # maintain 1m/5m/1h/1d OHLC rollups from published ticks
+    CANDLE_COLLECTION: str = "price_candles"
+    PRICE_WRITE_BEHIND: bool = True        # batch price inserts off the tick path
+    PRICE_WRITE_BATCH_SIZE: int = 50
+    PRICE_WRITE_MAX_AGE_SECONDS: float = 5.0
+    PRICE_WRITE_MAX_PENDING: int = 10000   # oldest documents are dropped past this while Mongo is down
 
     # --- API SETTINGS (Primary Source) ---
     API_BASE_URL: str = "https://www.goldapi.io/api" 
     API_SYMBOL: str = "XAU/USD"
+    # "off" (browser sources only), "parallel" (own loop next to the browser sources) or
+    # "primary" (tried first by the first browser source's loop, which falls back to the
+    # page). GoldAPI is paid and quota-limited, so polling it is opt-in.
+    GOLDAPI_MODE: str = "off"
+    GOLDAPI_MONTHLY_QUOTA: int = 100
+    GOLDAPI_QUOTA_RESERVE: int = 5         # requests kept back for manual checks
+    GOLDAPI_TIMEOUT_SECONDS: float = 10.0
+    GOLDAPI_MAX_CONNECTIONS: int = 4
+    API_USAGE_COLLECTION: str = "api_usage"   # per-month request counters shared by all processes
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000    # cached token -> user lookups
+    AUTH_CACHE_TTL_SECONDS: int = 300      # caps staleness for workers that missed an invalidation
+    PASSWORD_HASH_WORKERS: int = 2         # concurrent bcrypt hashes/verifications
+    PASSWORD_HASH_MAX_QUEUE: int = 64      # waiting bcrypt calls before logins get a 503
     FAILOVER_URL: str = "https://www.ig.com/en/commodities/markets-commodities/gold"
     FAILOVER_CSS_SELECTOR: str = "div[data-field='BID']"
+    # Request blocking for the failover page. Allow patterns win over deny rules.
+    FAILOVER_BLOCK_RESOURCE_TYPES: List[str] = ["image", "media", "font"]
+    FAILOVER_BLOCK_URL_PATTERNS: List[str] = [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*hotjar.com*", "*bing.com*", "*adsrvr.org*", "*youtube.com*",
+    ]
+    FAILOVER_ALLOW_URL_PATTERNS: List[str] = ["*cookielaw.org*", "*onetrust.com*"]
     
     TARGET_URL: str = "https://www.tradingview.com/symbols/GOLD/?exchange=TVC"
-    SCRAPE_INTERVAL_SECONDS: int = 2
+    SCRAPE_INTERVAL_SECONDS: int = 2       # starting poll interval until volatility is known
     PRICE_CSS_SELECTOR: str = "span[data-qa-id='symbol-last-value']"
+    # Request blocking for the TradingView page.
+    TARGET_BLOCK_RESOURCE_TYPES: List[str] = ["image", "media", "font"]
+    TARGET_BLOCK_URL_PATTERNS: List[str] = [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    ]
+    TARGET_ALLOW_URL_PATTERNS: List[str] = []
     API_KEY_HEADER: str = "X-API-Key"
 
+    # --- Playwright Scraper Settings ---
+    SCRAPER_PERSISTENT_PAGE: bool = True   # keep one live page open and re-read its DOM every tick
+    PAGE_MAX_AGE_SECONDS: int = 1800       # re-navigate periodically to shed page memory growth
+    PAGE_STALE_SECONDS: int = 300          # re-navigate if the live price text stops changing this long
+    PAGE_MAX_ERRORS: int = 3               # consecutive read failures before the page is rebuilt
+    BROWSER_SOURCES: List[str] = ["FAILOVER"]  # add "TARGET" to scrape TradingView in parallel
+    BROWSER_POOL_SIZE: int = 2             # isolated browser contexts shared by the browser sources
+
+    # --- WebSocket Settings ---
+    WS_SEND_TIMEOUT_SECONDS: float = 2.0   # clients slower than this on a send are evicted
+    WS_CLIENT_QUEUE_SIZE: int = 16         # max unsent frames per client (price frames conflate per source+symbol)
+    WS_CLIENT_MAX_LAG_SECONDS: float = 30.0  # disconnect clients whose queue has not drained for this long
+    WS_MIN_UPDATE_RATE_INTERVAL: float = 60.0  # slowest update rate a client may request (seconds per tick)
+    WS_PING_INTERVAL_SECONDS: float = 15.0 # server ping to protocol clients that have gone quiet
+    WS_IDLE_TIMEOUT_SECONDS: float = 45.0  # close protocol clients that send nothing (not even pong) this long
+
+    # --- Cross-process Fan-out ---
+    RUN_SCRAPER: bool = True               # false: API-only process (Playwright is never imported)
+    # "in_process": scraper loop on the API event loop. "subprocess": supervised worker.py
+    # child that streams ticks back over a pipe.
+    SCRAPER_PROCESS: str = "in_process"
+    SCRAPER_RESTART_MAX_BACKOFF_SECONDS: float = 60.0
+    SCRAPER_RESTART_RESET_SECONDS: float = 120.0   # a child that ran this long restarts without backoff
+    SCRAPER_STOP_TIMEOUT_SECONDS: float = 10.0
+    # "local": the scraper broadcasts in its own process. "change_stream": the scraper writes
+    # ticks to LIVE_TICK_COLLECTION and every API replica tails it (needs a replica set).
+    TICK_FANOUT: str = "local"
+    LIVE_TICK_COLLECTION: str = "live_ticks"
+    LIVE_TICK_TTL_SECONDS: int = 3600
+    # "shared_memory": one uvicorn worker scrapes and publishes into an mmap segment that
+    # the other workers on the same host poll (for `uvicorn --workers N`).
+    SHM_PATH: Optional[str] = None         # defaults to /dev/shm/gold_price_tick
+    SHM_POLL_INTERVAL_SECONDS: float = 0.05
+    SHM_LEADER_RETRY_SECONDS: float = 5.0
+
+    # --- Server-Sent Events ---
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    SSE_RETRY_MS: int = 3000               # client reconnect delay advertised in the stream
+    SSE_REPLAY_EVENTS: int = 256           # events kept for Last-Event-ID resume
+    SSE_CLIENT_QUEUE_SIZE: int = 16
+
+    # --- Adaptive Polling ---
+    POLL_MIN_INTERVAL_SECONDS: float = 1.0
+    POLL_MAX_INTERVAL_SECONDS: float = 30.0
+    POLL_TARGET_MOVE_BPS: float = 1.0      # poll about once per expected 1bp (0.01%) move
+    POLL_VOLATILITY_WINDOW: int = 20       # EWMA span, in polls
+    POLL_BACKOFF_BASE_SECONDS: float = 2.0 # per-source backoff after failures
+    POLL_BACKOFF_MAX_SECONDS: float = 300.0
+    # Market hours (spot gold): polling sleeps while closed
+    MARKET_HOURS_ENABLED: bool = True
+    MARKET_TIMEZONE: str = "America/New_York"
+    MARKET_WEEKLY_OPEN: str = "Sun 18:00"
+    MARKET_WEEKLY_CLOSE: str = "Fri 17:00"
+    MARKET_DAILY_BREAK: Optional[str] = "17:00-18:00"
+    MARKET_HOLIDAYS: List[str] = []        # YYYY-MM-DD, closed all day in MARKET_TIMEZONE
+    MARKET_CLOSED_RECHECK_SECONDS: float = 3600.0  # longest single sleep while closed
+
+    # --- Change Detection ---
+    CHANGE_GATE_ENABLED: bool = True       # skip save/broadcast when a source repeats its last price
+    CHANGE_MIN_TICK: float = 0.0           # minimum price move to publish; 0 means any change
+    CHANGE_HEARTBEAT_SECONDS: int = 60     # publish anyway after this much silence; 0 disables
+    SCRAPER_STATS_LOG_SECONDS: int = 300   # log change-detection counters this often; 0 disables
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,8 @@
+# conftest.py
+#
+# Settings() requires these; the unit tests never reach a real API or database.
+import os
+
+os.environ.setdefault("API_KEY", "test")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test")
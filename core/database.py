@@ -1,4 +1,5 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
 from config.settings import settings
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional
@@ -26,6 +27,108 @@ async def connect_to_mongo():
         print(f"❌ MongoDB connection error: {e}")
         raise
 
+    await ensure_price_collection(client)
+    await ensure_candle_collection(client)
+    await ensure_live_tick_collection(client)
+    await ensure_user_collection(client)
+
+async def ensure_price_collection(mongo_client: AsyncIOMotorClient):
+    """
+    Creates the price collection as a time-series collection (timestamp as timeField,
+    source as metaField) plus its indexes. Safe to run on every startup.
+    """
+    db = mongo_client[settings.MONGO_DB]
+    name = settings.MONGO_COLLECTION
+
+    collections = await db.list_collections(filter={"name": name})
+    existing = await collections.to_list(length=1)
+    if not existing and settings.PRICE_TIMESERIES:
+        options = {
+            "timeseries": {
+                "timeField": "timestamp",
+                "metaField": "source",
+                "granularity": settings.PRICE_TIMESERIES_GRANULARITY,
+            }
+        }
+        if settings.PRICE_RETENTION_DAYS:
+            options["expireAfterSeconds"] = settings.PRICE_RETENTION_DAYS * 86400
+        try:
+            await db.create_collection(name, **options)
+            print(f"Created time-series collection '{name}'.")
+        except CollectionInvalid:
+            pass  # another process created it first
+        except OperationFailure as e:
+            # Pre-5.0 servers do not support time-series; fall back to a plain collection
+            print(f"Time-series collection not available ({e}). Using a regular collection.")
+    elif existing and existing[0].get("type") != "timeseries" and settings.PRICE_TIMESERIES:
+        print(f"'{name}' already exists as a regular collection; migrate it to get time-series storage.")
+
+    collection = db.get_collection(name)
+    try:
+        # Latest-price and range queries, plus /history keyset pages sorted on
+        # (timestamp, _id): the trailing _id lets those pages walk the index
+        # instead of sorting every matching tick in memory.
+        await collection.create_index(
+            [("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id"
+        )
+        await collection.create_index(
+            [("source", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="source_timestamp_id",
+        )
+        await collection.create_index(
+            [("symbol", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="symbol_timestamp_id",
+        )
+    except OperationFailure as e:
+        print(f"Could not create price indexes: {e}")
+
+async def ensure_candle_collection(mongo_client: AsyncIOMotorClient):
+    """Unique (interval, source, start) index so candle upserts stay idempotent."""
+    collection = mongo_client[settings.MONGO_DB].get_collection(settings.CANDLE_COLLECTION)
+    try:
+        await collection.create_index(
+            [("interval", ASCENDING), ("source", ASCENDING), ("start", DESCENDING)],
+            name="interval_source_start",
+            unique=True,
+        )
+        await collection.create_index(
+            [("interval", ASCENDING), ("start", DESCENDING)], name="interval_start"
+        )
+    except OperationFailure as e:
+        print(f"Could not create candle indexes: {e}")
+
+async def ensure_live_tick_collection(mongo_client: AsyncIOMotorClient):
+    """
+    Regular (not time-series) collection for cross-process fan-out: change streams
+    cannot be opened on time-series collections. A TTL index keeps it small.
+    """
+    collection = mongo_client[settings.MONGO_DB].get_collection(settings.LIVE_TICK_COLLECTION)
+    try:
+        await collection.create_index(
+            [("timestamp", ASCENDING)],
+            name="timestamp_ttl",
+            expireAfterSeconds=settings.LIVE_TICK_TTL_SECONDS,
+        )
+    except OperationFailure as e:
+        print(f"Could not create live tick TTL index: {e}")
+
+async def ensure_user_collection(mongo_client: AsyncIOMotorClient):
+    """Indexes behind the admin listing's filters, sorts and keyset cursors."""
+    collection = mongo_client[settings.MONGO_DB].get_collection("users")
+    indexes = [
+        ([("email", ASCENDING)], "email_unique", {"unique": True}),
+        ([("created_at", DESCENDING), ("_id", DESCENDING)], "created_at_id", {}),
+        ([("role", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], "role_created_at", {}),
+        ([("account_type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], "account_type_created_at", {}),
+        ([("country", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], "country_created_at", {}),
+    ]
+    for keys, name, options in indexes:
+        try:
+            await collection.create_index(keys, name=name, **options)
+        except OperationFailure as e:
+            # e.g. existing duplicate emails block the unique index
+            print(f"Could not create user index '{name}': {e}")
+
 async def close_mongo_connection():
     """Closes the MongoDB connection."""
     global client
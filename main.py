@@ -110,8 +110,7 @@
 
 from fastapi import FastAPI
 from core.database import connect_to_mongo, close_mongo_connection, get_mongo_client
-from api.endpoints import websocket, users, auth, admin
-from services.playwright_scraper_service import PlaywrightGoldScrapingService as GoldScrapingService
+from api.endpoints import websocket, users, auth, admin, prices, sse, stats
 from services.repositories.price_repo import PriceRepository
 from services.repositories.user_repo import UserRepository
 from starlette.middleware.cors import CORSMiddleware
@@ -119,6 +118,16 @@ from config.settings import settings
 from datetime import datetime
 import asyncio
 from services.websocket_manager import manager
+from services.tick_buffer import tick_buffer
+from services.analytics import PriceAnalyticsService
+from services.price_change_stream import PriceChangeStreamListener
+from services.websocket_manager import manager as ws_manager
+from services.shared_tick import shared_tick
+from services.sse_hub import sse_hub
+from security.auth import password_pool
+from services.scraper_supervisor import ScraperSupervisor
+from services.candle_rollup import CandleRollup
+from services.repositories.candle_repo import CandleRepository
 
 app = FastAPI(title="RealTime Price Scraper API", version="1.0.0")
 
@@ -183,26 +192,95 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-# Initialize repos and scraper
+# SSE subscribers get the same encoded ticks as WebSocket clients
+ws_manager.add_frame_listener(sse_hub.publish)
+
+# Initialize repos. The scraper (and with it Playwright) is only imported when this
+# process scrapes; RUN_SCRAPER=false gives an API-only process.
 price_repo = PriceRepository()
-scraper = GoldScrapingService(repo=price_repo)
+scraper = None
+scraper_supervisor: ScraperSupervisor = None
+tick_listener: PriceChangeStreamListener = None
+scraper_task: asyncio.Task = None
+
+def build_scraper():
+    from services.playwright_scraper_service import PlaywrightGoldScrapingService as GoldScrapingService
+    return GoldScrapingService(repo=price_repo)
 
 @app.on_event("startup")
 async def startup_event():
+    global tick_listener, scraper, scraper_supervisor
     print("--- APPLICATION STARTUP ---")
     await connect_to_mongo()
     mongo_client = get_mongo_client()
+    if not settings.RUN_SCRAPER:
+        print("API-only mode: scraper disabled.")
+    elif settings.SCRAPER_PROCESS == "subprocess":
+        scraper_supervisor = ScraperSupervisor(ws_manager)
+    else:
+        scraper = build_scraper()
     app.state.user_repo = UserRepository(mongo_client)
-
-    # Start async scraper loop
-    asyncio.create_task(scraper.run_scraper_loop_async(mongo_client))
+    app.state.price_repo = price_repo
+    app.state.candle_rollup = None
+    app.state.scraper = scraper
+    app.state.scraper_supervisor = scraper_supervisor
+    app.state.analytics = PriceAnalyticsService(price_repo)
+
+    try:
+        await tick_buffer.seed(mongo_client, price_repo)
+    except Exception as e:
+        print(f"Could not seed tick buffer: {e}")
+
+    # Every process serves the live candle from its own mirror of the open buckets,
+    # fed by the ticks it broadcasts; this works whether the scraper runs here, in a
+    # child process, in another worker or on another replica
+    if settings.CANDLES_ENABLED:
+        candle_mirror = CandleRollup(CandleRepository())
+        try:
+            await candle_mirror.rebuild(mongo_client, price_repo, persist=False)
+        except Exception as e:
+            print(f"Could not rebuild open candles: {e}")
+        ws_manager.add_frame_listener(candle_mirror.on_tick)
+        app.state.candle_rollup = candle_mirror
+
+    # Replicas receive ticks from whichever process scrapes via the live-tick change stream
+    if settings.TICK_FANOUT == "change_stream":
+        tick_listener = PriceChangeStreamListener(mongo_client, ws_manager)
+        tick_listener.start()
+
+    async def start_scraper():
+        global scraper_task
+        if scraper_supervisor:
+            scraper_supervisor.start()
+        else:
+            scraper_task = asyncio.create_task(scraper.run_scraper_loop_async(mongo_client))
+
+    # Start async scraper loop (with --workers N, only the shared-memory publisher scrapes)
+    if settings.RUN_SCRAPER and settings.TICK_FANOUT == "shared_memory":
+        await shared_tick.start(ws_manager, start_scraper)
+    elif settings.RUN_SCRAPER:
+        await start_scraper()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("--- APPLICATION SHUTDOWN ---")
-    if scraper.browser:
-        await scraper._close_browser()
+    if tick_listener:
+        await tick_listener.stop()
+    if scraper_supervisor:
+        await scraper_supervisor.stop()
+    await shared_tick.stop()
+    # Stop the scraper loop before the final flush, so no tick is buffered after it
+    if scraper_task:
+        scraper_task.cancel()
+        try:
+            await scraper_task
+        except asyncio.CancelledError:
+            pass
+    if scraper:
+        await scraper.close(get_mongo_client())
+    await price_repo.flush()
+    password_pool.shutdown()
     await close_mongo_connection()
 
 
@@ -211,6 +289,9 @@ app.include_router(websocket.router)
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(users.router)
+app.include_router(prices.router)
+app.include_router(sse.router)
+app.include_router(stats.router)
 
 @app.get("/")
 def read_root():
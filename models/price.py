@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class PricePoint(BaseModel):
+    """A single stored tick as returned by the price API."""
+    id: str = Field(alias="_id")
+    price: str
+    source: str
+    symbol: Optional[str] = None
+    timestamp: datetime
+
+    class Config:
+        populate_by_name = True
+
+
+class PriceHistoryPage(BaseModel):
+    items: List[PricePoint]
+    next_cursor: Optional[str] = None
+
+
+class CandlePoint(BaseModel):
+    interval: str
+    source: str
+    start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int
+    closed: bool = True
+
+
+class RecentTick(BaseModel):
+    timestamp: datetime
+    price: float
+    source: str
+
+
+class Sparkline(BaseModel):
+    window_seconds: int
+    source: Optional[str] = None
+    prices: List[float]
+
+
+class AnalyticsResult(BaseModel):
+    start: datetime
+    end: datetime
+    source: Optional[str] = None
+    window: int
+    truncated: bool = False    # window had more than ANALYTICS_MAX_POINTS ticks; only the newest are included
+    timestamps: List[datetime]
+    prices: List[Optional[float]]
+    indicators: Dict[str, List[Optional[float]]]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr, Field,ConfigDict
 from enum import Enum
 from bson import ObjectId
@@ -51,6 +51,11 @@ class UserPublic(BaseModel):
     class Config:
         populate_by_name = True
 
+class UserPage(BaseModel):
+    items: List[UserPublic]
+    next_cursor: Optional[str] = None
+
+
 class UserUpdate(BaseModel):
     """Schema for updating user data (PATCH/PUT request)."""
     full_name: Optional[str] = None
@@ -84,4 +89,32 @@ class UserInDB(BaseModel):
             ObjectId: str,
             datetime: lambda dt: dt.isoformat() 
         }
-    )
\ No newline at end of file
+    )
+
+# --- Bulk admin operations ---
+BULK_MAX_ITEMS = 1000
+
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    role: UserRole = UserRole.USER
+
+class BulkUserUpdateItem(UserUpdate):
+    id: str
+
+class BulkUserUpdate(BaseModel):
+    users: List[BulkUserUpdateItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class BulkUserDelete(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: Literal['created', 'updated', 'deleted', 'error']
+    detail: Optional[str] = None
+    user: Optional[UserPublic] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
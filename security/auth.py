@@ -1,5 +1,9 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Annotated, Optional
+from typing import Annotated, Dict, Optional, Set, Tuple
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
@@ -23,6 +27,101 @@ def get_password_hash(password):
     truncated_password = password[:72] 
     return pwd_context.hash(truncated_password)
 
+
+class PasswordHashPool:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL), so a
+    login never blocks the event loop that serves ticks. At most PASSWORD_HASH_WORKERS
+    hashes run at once; past PASSWORD_HASH_MAX_QUEUE waiting calls, new ones get a
+    503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    async def run(self, fn, *args):
+        # Unclamped: with max_queue=0 calls still run while a worker is free
+        if self.in_flight - self.workers >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        submitted = time.monotonic()
+
+        def timed():
+            self.total_wait += time.monotonic() - submitted
+            return fn(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), timed)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def map(self, fn, items, return_exceptions: bool = False) -> list:
+        """
+        Runs `fn` over items in parallel on the pool. A bulk job holds at most
+        `workers` slots at a time, so it never fills the queue logins wait in.
+        With `return_exceptions`, a rejected or failed item gives its exception in
+        place of a result and the other items still run.
+        """
+        gate = asyncio.Semaphore(self.workers)
+
+        async def one(item):
+            async with gate:
+                return await self.run(fn, item)
+
+        return await asyncio.gather(*(one(item) for item in items), return_exceptions=return_exceptions)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(1000 * self.total_wait / self.completed, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+async def get_password_hashes_async(passwords) -> list:
+    """Hashes in input order; an item the pool rejected holds its HTTPException instead."""
+    return await password_pool.map(get_password_hash, passwords, return_exceptions=True)
+
 # ----------------- JWT (JSON Web Tokens) -----------------
 SECRET_KEY = settings.SECRET_KEY 
 ALGORITHM = "HS256"
@@ -38,6 +137,72 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# ----------------- PRINCIPAL CACHE -----------------
+class PrincipalCache:
+    """
+    Bounded LRU of token -> resolved UserInDB. An entry lives until the token's
+    `exp` or AUTH_CACHE_TTL_SECONDS, whichever is sooner, so a hit skips both the
+    JWT decode and the Mongo lookup. UserRepository drops a user's entries on
+    update/delete; the TTL bounds staleness for other worker processes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, UserInDB]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if time.time() >= expires_at:
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: UserInDB, token_exp: Optional[float]):
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        self._remove(token)
+        self._entries[token] = (expires_at, user)
+        self._tokens_by_user.setdefault(str(user.id), set()).add(token)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            user_id = str(entry[1].id)
+            tokens = self._tokens_by_user.get(user_id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: str):
+        """Drops every cached token of a user (after an update or delete)."""
+        for token in list(self._tokens_by_user.get(str(user_id), ())):
+            self._remove(token)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
 # ----------------- AUTH DEPENDENCIES -----------------
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
@@ -45,18 +210,18 @@ def get_user_repo_dependency(request: Request) -> UserRepository:
     """Retrieves the UserRepository instance from the FastAPI app state."""
     return request.app.state.user_repo
 
-# DEFINITION OF THE FUNCTION TO GET THE CURRENT USER
-async def get_current_user_doc(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)]
-) -> UserInDB:
-    """Dependency to retrieve the UserInDB object from the token."""
+async def _resolve_principal(token: str, user_repo: UserRepository) -> UserInDB:
+    """Token -> UserInDB, served from the principal cache when possible."""
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_email: str = payload.get("sub")
@@ -66,12 +231,21 @@ async def get_current_user_doc(
         raise credentials_exception
 
     user = await user_repo.get_user_by_email(user_email)
-    
+
     if user is None:
         raise credentials_exception
-    
+
+    principal_cache.put(token, user, payload.get("exp"))
     return user
 
+# DEFINITION OF THE FUNCTION TO GET THE CURRENT USER
+async def get_current_user_doc(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)]
+) -> UserInDB:
+    """Dependency to retrieve the UserInDB object from the token."""
+    return await _resolve_principal(token, user_repo)
+
 async def get_current_active_admin(current_user: Annotated[UserInDB, Depends(get_current_user_doc)]) -> UserInDB:
     """Dependency to check if the current user is an active 'admin'."""
     if current_user.role != 'admin':
@@ -87,28 +261,4 @@ async def get_current_user(
     user_repo: Annotated[UserRepository, Depends(get_user_repo_dependency)],
     settings: Annotated[Settings, Depends(get_settings)] 
 ) -> UserInDB:
-    
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-            
-    except (JWTError, AttributeError):
-        raise credentials_exception
-
-    user_doc = await user_repo.get_user_by_email(email)
-    
-    if user_doc is None:
-        raise credentials_exception
-        
-    return user_doc
\ No newline at end of file
+    return await _resolve_principal(token, user_repo)
\ No newline at end of file
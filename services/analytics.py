@@ -0,0 +1,231 @@
+# services/analytics.py
+
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import settings
+from services.repositories.price_repo import PriceRepository
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+
+import numpy as np
+
+INDICATORS = ("sma", "ema", "volatility", "roc", "bands")
+
+
+# --- Indicators (all take a float64 price array, return arrays aligned with it) ---
+def sma(prices: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(prices.shape, np.nan)
+    if len(prices) >= window:
+        csum = np.cumsum(np.insert(prices, 0, 0.0))
+        out[window - 1:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def ema(prices: np.ndarray, window: int) -> np.ndarray:
+    """
+    EMA with alpha = 2 / (window + 1), computed in closed form per chunk:
+    ema[j] = d^(j+1) * prev + alpha * d^j * cumsum(x[k] / d^k). Chunks are kept
+    short enough that d^-k stays well inside float64 range.
+    """
+    out = np.empty_like(prices)
+    if len(prices) == 0:
+        return out
+    alpha = 2.0 / (window + 1)
+    decay = 1.0 - alpha
+    chunk = max(1, int(12 * math.log(10) / -math.log(decay)))
+    prev = prices[0]
+    for begin in range(0, len(prices), chunk):
+        x = prices[begin:begin + chunk]
+        k = np.arange(len(x))
+        powers = decay ** k
+        out[begin:begin + len(x)] = decay * powers * prev + alpha * powers * np.cumsum(x / powers)
+        prev = out[begin + len(x) - 1]
+    return out
+
+
+def rolling_volatility(prices: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample std-dev of log returns over `window` returns."""
+    out = np.full(prices.shape, np.nan)
+    if len(prices) <= window:
+        return out
+    returns = np.diff(np.log(prices))
+    csum = np.cumsum(np.insert(returns, 0, 0.0))
+    csq = np.cumsum(np.insert(returns * returns, 0, 0.0))
+    total = csum[window:] - csum[:-window]
+    total_sq = csq[window:] - csq[:-window]
+    variance = (total_sq - total * total / window) / (window - 1)
+    out[window:] = np.sqrt(np.clip(variance, 0.0, None))
+    return out
+
+
+def rate_of_change(prices: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(prices.shape, np.nan)
+    if len(prices) > window:
+        out[window:] = (prices[window:] / prices[:-window] - 1.0) * 100.0
+    return out
+
+
+def min_max_bands(prices: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    low = np.full(prices.shape, np.nan)
+    high = np.full(prices.shape, np.nan)
+    if len(prices) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(prices, window)
+        low[window - 1:] = windows.min(axis=1)
+        high[window - 1:] = windows.max(axis=1)
+    return low, high
+
+
+def _to_list(values: np.ndarray) -> List[Optional[float]]:
+    """NaN (warm-up rows) becomes None so it serialises as JSON null."""
+    return [None if math.isnan(v) else round(float(v), 6) for v in values]
+
+
+def compute_indicator(name: str, prices: np.ndarray, window: int) -> Dict[str, np.ndarray]:
+    if name == "sma":
+        return {"sma": sma(prices, window)}
+    if name == "ema":
+        return {"ema": ema(prices, window)}
+    if name == "volatility":
+        return {"volatility": rolling_volatility(prices, window)}
+    if name == "roc":
+        return {"roc": rate_of_change(prices, window)}
+    if name == "bands":
+        low, high = min_max_bands(prices, window)
+        return {"band_low": low, "band_high": high}
+    raise ValueError(f"Unknown indicator '{name}'")
+
+
+def _nbytes(value) -> int:
+    """Size of the NumPy arrays held in a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, tuple):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+class _TTLCache:
+    """Small LRU with a per-entry expiry, bounded by entry count and array bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._data: "OrderedDict[Any, Tuple[float, int, Any]]" = OrderedDict()
+
+    def _pop(self, key):
+        _, size, _ = self._data.pop(key)
+        self.nbytes -= size
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at and time.monotonic() > expires_at:
+            self._pop(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float):
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return  # larger than the whole cache; not worth evicting everything for
+        if key in self._data:
+            self._pop(key)
+        self._data[key] = (time.monotonic() + ttl if ttl else 0.0, size, value)
+        self.nbytes += size
+        while len(self._data) > self.max_entries or self.nbytes > self.max_bytes:
+            self._pop(next(iter(self._data)))
+
+
+class PriceAnalyticsService:
+    """
+    Loads a price window once into NumPy arrays and computes indicators over it.
+    Both the loaded series and each (range, indicator, params) result are cached as
+    arrays, each cache capped at ANALYTICS_CACHE_MAX_BYTES. Windows holding more than
+    ANALYTICS_MAX_POINTS ticks keep the newest ones and are flagged `truncated`.
+    Ranges that end in the past never change, so they only leave the cache by LRU;
+    ranges that reach "now" expire after ANALYTICS_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, price_repo: PriceRepository):
+        self.price_repo = price_repo
+        self._series = _TTLCache(settings.ANALYTICS_CACHE_ENTRIES, settings.ANALYTICS_CACHE_MAX_BYTES)
+        self._results = _TTLCache(
+            settings.ANALYTICS_CACHE_ENTRIES * len(INDICATORS), settings.ANALYTICS_CACHE_MAX_BYTES
+        )
+
+    def _ttl_for(self, end: datetime) -> float:
+        ttl = settings.ANALYTICS_CACHE_TTL_SECONDS
+        return ttl if (datetime.utcnow() - end).total_seconds() < ttl else 0.0
+
+    async def _load_series(
+        self, client: MongoClient, start: datetime, end: datetime, source: Optional[str]
+    ) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """(datetime64[ms] timestamps, float64 prices, truncated) for the window."""
+        key = (start, end, source)
+        cached = self._series.get(key)
+        if cached is not None:
+            return cached
+
+        # One extra row tells us whether the window had more ticks than we keep
+        max_points = settings.ANALYTICS_MAX_POINTS
+        docs = await self.price_repo.get_price_series(
+            client, start, end, source=source, limit=max_points + 1
+        )
+        truncated = len(docs) > max_points
+        if truncated:
+            docs = docs[1:]
+        timestamps: List[datetime] = []
+        values: List[float] = []
+        for doc in docs:
+            try:
+                values.append(float(str(doc["price"]).replace(',', '')))
+            except (TypeError, ValueError):
+                continue
+            timestamps.append(doc["timestamp"])
+        series = (
+            np.array(timestamps, dtype="datetime64[ms]"),
+            np.asarray(values, dtype=np.float64),
+            truncated,
+        )
+        self._series.set(key, series, self._ttl_for(end))
+        return series
+
+    async def analyze(
+        self,
+        client: MongoClient,
+        start: datetime,
+        end: datetime,
+        indicators: List[str],
+        window: int,
+        source: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        timestamps, prices, truncated = await self._load_series(client, start, end, source)
+        ttl = self._ttl_for(end)
+
+        results: Dict[str, List[Optional[float]]] = {}
+        for name in indicators:
+            key = (start, end, source, name, window)
+            computed = self._results.get(key)
+            if computed is None:
+                computed = compute_indicator(name, prices, window)
+                self._results.set(key, computed, ttl)
+            results.update({column: _to_list(values) for column, values in computed.items()})
+
+        return {
+            "start": start,
+            "end": end,
+            "source": source,
+            "window": window,
+            "truncated": truncated,
+            "timestamps": timestamps.tolist(),
+            "prices": _to_list(prices),
+            "indicators": results,
+        }
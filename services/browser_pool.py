@@ -0,0 +1,174 @@
+# services/browser_pool.py
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Page
+from services.request_blocking import RequestBlocker
+
+
+@dataclass
+class PooledPage:
+    """One isolated browser context with a single page, handed out by the pool."""
+    slot: int
+    context: Optional[BrowserContext] = None
+    page: Optional[Page] = None
+    source: Optional[str] = None   # source the page is currently navigated to
+    navigated_at: float = 0.0
+    crashed: bool = False
+    blocker: Optional[RequestBlocker] = None   # blocker whose handlers are on the page
+
+    def is_usable(self) -> bool:
+        return self.page is not None and not self.page.is_closed() and not self.crashed
+
+    def mark_navigated(self, source: str):
+        self.source = source
+        self.navigated_at = time.monotonic()
+
+    def invalidate(self):
+        """Forces the next user of this slot to navigate again."""
+        self.source = None
+
+
+class BrowserContextPool:
+    """
+    Bounded pool of browser contexts shared by all browser sources.
+    Waiters are served in FIFO order, a free page already on the requested source
+    is preferred, contexts are reused across sources, and crashed or closed pages
+    are rebuilt on their next checkout.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+        self._slots: List[PooledPage] = [PooledPage(slot=i) for i in range(self.size)]
+        self._idle: List[PooledPage] = list(self._slots)
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        self._launch_lock = asyncio.Lock()
+        self.recovered_pages: int = 0
+
+    # --- Browser lifecycle ---
+    async def _ensure_browser(self) -> Browser:
+        async with self._launch_lock:
+            if self.browser and not self.browser.is_connected():
+                print("Playwright Browser disconnected. Relaunching.")
+                self.browser = None
+                for slot in self._slots:
+                    slot.context, slot.page, slot.blocker = None, None, None
+                    slot.invalidate()
+            if not self.browser:
+                if not self.playwright:
+                    self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(headless=True)
+            return self.browser
+
+    async def close(self):
+        for slot in self._slots:
+            await self._discard(slot)
+        if self.browser:
+            await self.browser.close()
+            print("Playwright Browser closed.")
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    # --- Slot lifecycle ---
+    async def _discard(self, slot: PooledPage):
+        if slot.context:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.context, slot.page = None, None
+        slot.crashed = False
+        slot.blocker = None
+        slot.invalidate()
+
+    async def _prepare(self, slot: PooledPage, source: str):
+        """
+        Rebuilds the slot's context only if its page crashed or was closed. A slot that
+        moves to another source keeps its context and page; the caller navigates it
+        and swaps the request blocker on the live page.
+        """
+        if slot.page is not None and not slot.is_usable():
+            self.recovered_pages += 1
+            print(f"Browser pool: recovering crashed page in slot {slot.slot}.")
+            await self._discard(slot)
+
+        if slot.page is None:
+            browser = await self._ensure_browser()
+            slot.context = await browser.new_context(viewport={"width": 1400, "height": 900})
+            slot.page = await slot.context.new_page()
+            slot.page.on("crash", lambda _page, s=slot: setattr(s, "crashed", True))
+
+    # --- Checkout ---
+    def _take_idle(self, source: str) -> PooledPage:
+        for slot in self._idle:
+            if slot.source == source and slot.is_usable():
+                self._idle.remove(slot)
+                return slot
+        # Prefer a blank slot over stealing a page that is live on another source
+        for slot in self._idle:
+            if slot.source is None:
+                self._idle.remove(slot)
+                return slot
+        return self._idle.pop(0)
+
+    async def acquire(self, source: str) -> PooledPage:
+        if self._idle and not self._waiters:
+            slot = self._take_idle(source)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append((source, future))
+            try:
+                slot = await future
+            except asyncio.CancelledError:
+                # The slot may have been handed over just before cancellation
+                if future.done() and not future.cancelled():
+                    self.release(future.result())
+                raise
+
+        try:
+            await self._prepare(slot, source)
+        except Exception:
+            await self._discard(slot)
+            self.release(slot)
+            raise
+        return slot
+
+    def release(self, slot: PooledPage):
+        while self._waiters:
+            _, future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(slot)
+                return
+        self._idle.append(slot)
+
+    @asynccontextmanager
+    async def page(self, source: str) -> AsyncIterator[PooledPage]:
+        slot = await self.acquire(source)
+        try:
+            yield slot
+        except Exception:
+            # A closed or crashed page cannot be read in place again. Read failures on a
+            # healthy page are left to the caller, which re-navigates after repeated errors.
+            if not slot.is_usable():
+                slot.invalidate()
+            raise
+        finally:
+            self.release(slot)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "idle": len(self._idle),
+            "waiting": len(self._waiters),
+            "recovered_pages": self.recovered_pages,
+            "bound_sources": [slot.source for slot in self._slots],
+        }
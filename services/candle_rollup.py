@@ -0,0 +1,132 @@
+# services/candle_rollup.py
+
+import asyncio
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from services.change_detector import parse_price
+from services.frame_codec import Tick
+from services.repositories.candle_repo import CandleRepository
+from services.repositories.price_repo import PriceRepository
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+
+CANDLE_INTERVALS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_start(timestamp: datetime, seconds: int) -> datetime:
+    offset = int((timestamp - _EPOCH).total_seconds()) // seconds * seconds
+    return _EPOCH + timedelta(seconds=offset)
+
+
+@dataclass
+class Candle:
+    interval: str
+    source: str
+    start: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    count: int = 1
+
+    def add(self, value: float):
+        if value > self.high:
+            self.high = value
+        if value < self.low:
+            self.low = value
+        self.close = value
+        self.count += 1
+
+
+class CandleRollup:
+    """
+    Keeps the open OHLC bucket for every (interval, source) in memory and updates
+    it in O(1) per tick. When a tick lands in a new bucket the old one is closed
+    and written to the candle collection in the background.
+    """
+
+    def __init__(self, candle_repo: CandleRepository, intervals: Optional[Dict[str, int]] = None):
+        self.candle_repo = candle_repo
+        self.intervals = intervals or CANDLE_INTERVALS
+        self.open: Dict[Tuple[str, str], Candle] = {}
+        self._pending_writes: Set[asyncio.Task] = set()
+
+    def _apply(self, value: float, source: str, timestamp: datetime) -> List[Candle]:
+        closed: List[Candle] = []
+        for interval, seconds in self.intervals.items():
+            start = bucket_start(timestamp, seconds)
+            key = (interval, source)
+            candle = self.open.get(key)
+            if candle is not None and candle.start == start:
+                candle.add(value)
+                continue
+            if candle is not None and start < candle.start:
+                continue  # late tick for a bucket that is already closed
+            if candle is not None:
+                closed.append(candle)
+            self.open[key] = Candle(interval, source, start, value, value, value, value)
+        return closed
+
+    def update(self, client: MongoClient, price: str, source: str, timestamp: datetime):
+        """Folds one published tick into the open buckets."""
+        value = parse_price(price)
+        if value is None:
+            return
+        closed = self._apply(value, source, timestamp)
+        if closed:
+            task = asyncio.create_task(self._persist(client, closed))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    def on_tick(self, tick: Tick):
+        """
+        Frame listener for a read-only mirror of the open buckets, kept by every API
+        process from the ticks it broadcasts. Closed buckets are not written: the
+        scraping process's own rollup stores them.
+        """
+        value = parse_price(tick.data.get("price"))
+        if value is None or tick.time_ms is None:
+            return
+        self._apply(value, tick.data.get("source", "N/A"), _EPOCH + timedelta(milliseconds=tick.time_ms))
+
+    async def _persist(self, client: MongoClient, candles: List[Candle]):
+        try:
+            await self.candle_repo.save_candles(client, [asdict(c) for c in candles])
+        except Exception as e:
+            print(f"Candle persist failed: {e}")
+
+    async def rebuild(self, client: MongoClient, price_repo: PriceRepository, persist: bool = True):
+        """Restores open buckets after a restart by replaying today's raw ticks."""
+        longest = max(self.intervals.values())
+        since = bucket_start(datetime.utcnow(), longest)
+        closed: List[Candle] = []
+        replayed = 0
+        async for doc in price_repo.iter_prices_since(client, since):
+            value = parse_price(doc.get("price"))
+            if value is None:
+                continue
+            closed.extend(self._apply(value, doc.get("source", "N/A"), doc["timestamp"]))
+            replayed += 1
+        # Upserts, so buckets written before the restart are simply rewritten
+        if persist:
+            await self.candle_repo.save_candles(client, [asdict(c) for c in closed])
+        print(f"Candle rollup rebuilt from {replayed} ticks since {since.isoformat()}.")
+
+    def open_candles(self, interval: str, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            asdict(c) for (iv, src), c in self.open.items()
+            if iv == interval and (source is None or src == source)
+        ]
+
+    async def flush(self, client: MongoClient):
+        """Waits for in-flight writes and stores the still-open buckets."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+        await self._persist(client, list(self.open.values()))
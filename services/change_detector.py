@@ -0,0 +1,90 @@
+# services/change_detector.py
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from config.settings import settings
+
+
+def parse_price(price: Any) -> Optional[float]:
+    """Turns scraped text such as '4,012.35' into a float, or None if it is not numeric."""
+    try:
+        return float(str(price).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _SourceState:
+    price: str
+    value: Optional[float]
+    published_at: float
+
+
+class ChangeDetector:
+    """
+    Gate in front of save_price/broadcast. A tick passes when its price moved by
+    at least `min_tick` (or changed at all when min_tick is 0) since the last
+    published tick from the same source, or when that source has been silent for
+    `heartbeat_seconds`. Everything else is counted and dropped.
+    """
+
+    def __init__(self, min_tick: float = 0.0, heartbeat_seconds: float = 0.0, enabled: bool = True):
+        self.min_tick = min_tick
+        self.heartbeat_seconds = heartbeat_seconds
+        self.enabled = enabled
+        self.last: Dict[str, _SourceState] = {}
+        self.passed: int = 0
+        self.heartbeats: int = 0
+        self.suppressed: int = 0
+        self.suppressed_by_source: Dict[str, int] = {}
+
+    @classmethod
+    def from_settings(cls) -> "ChangeDetector":
+        return cls(
+            min_tick=settings.CHANGE_MIN_TICK,
+            heartbeat_seconds=settings.CHANGE_HEARTBEAT_SECONDS,
+            enabled=settings.CHANGE_GATE_ENABLED,
+        )
+
+    def seed(self, last_doc: Optional[Dict[str, Any]]):
+        """Primes the gate with the last stored price so a restart does not re-save it."""
+        if last_doc and last_doc.get("price") and last_doc.get("source"):
+            self._remember(last_doc["source"], last_doc["price"])
+
+    def _remember(self, source: str, price: str):
+        self.last[source] = _SourceState(price=price, value=parse_price(price), published_at=time.monotonic())
+
+    def _is_change(self, previous: _SourceState, price: str) -> bool:
+        if self.min_tick <= 0:
+            return price != previous.price
+        value = parse_price(price)
+        if value is None or previous.value is None:
+            return price != previous.price
+        return abs(value - previous.value) >= self.min_tick
+
+    def should_publish(self, price: str, source: str) -> bool:
+        """Returns True if the tick should be saved and broadcast, and records it if so."""
+        if not self.enabled:
+            return True
+
+        previous = self.last.get(source)
+        if previous is None or self._is_change(previous, price):
+            self.passed += 1
+        elif self.heartbeat_seconds and time.monotonic() - previous.published_at >= self.heartbeat_seconds:
+            self.heartbeats += 1
+        else:
+            self.suppressed += 1
+            self.suppressed_by_source[source] = self.suppressed_by_source.get(source, 0) + 1
+            return False
+
+        self._remember(source, price)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "passed": self.passed,
+            "heartbeats": self.heartbeats,
+            "suppressed": self.suppressed,
+            "suppressed_by_source": dict(self.suppressed_by_source),
+        }
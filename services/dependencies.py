@@ -1,8 +1,11 @@
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Request
 from motor.motor_asyncio import AsyncIOMotorClient 
 from config.settings import Settings 
 from services.repositories.user_repo import UserRepository
+from services.repositories.price_repo import PriceRepository
+from services.repositories.candle_repo import CandleRepository
+from services.analytics import PriceAnalyticsService
 from core.database import get_mongo_client 
 
 
@@ -25,4 +28,17 @@ async def get_user_repo_dependency(
     db: Annotated[AsyncIOMotorClient, Depends(get_db)]
 ) -> UserRepository:
     """Provides a UserRepository instance tied to the database."""
-    return UserRepository(db=db)
\ No newline at end of file
+    return UserRepository(db=db)
+
+def get_price_repo(request: Request) -> PriceRepository:
+    """Provides the shared PriceRepository from the app state."""
+    return request.app.state.price_repo
+
+
+def get_candle_repo() -> CandleRepository:
+    return CandleRepository()
+
+
+def get_analytics_service(request: Request) -> PriceAnalyticsService:
+    """Provides the shared analytics service (and its result cache)."""
+    return request.app.state.analytics
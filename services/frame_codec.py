@@ -0,0 +1,154 @@
+# services/frame_codec.py
+
+import json
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from services.change_detector import parse_price
+
+import msgpack
+
+# Negotiated per connection with `Sec-WebSocket-Protocol: gold.<encoding>` or `?encoding=`.
+# Control messages and replies are always JSON text frames; only ticks change encoding.
+ENCODINGS = ("json", "msgpack", "binary")
+SUBPROTOCOL_PREFIX = "gold."
+
+# Prices travel as fixed-point integers so deltas are exact
+PRICE_SCALE = 10_000
+
+FRAME_KEY = 1
+FRAME_DELTA = 2
+
+# Binary layout, little-endian:
+#   key   : u8 type=1, u16 stream id, i64 epoch ms, i64 scaled price,
+#           u8 len + source utf-8, u8 len + symbol utf-8
+#   delta : u8 type=2, u16 stream id, u32 ms since previous, i32 scaled price change
+KEY_HEADER = struct.Struct("<BHqq")
+DELTA = struct.Struct("<BHIi")
+MAX_STREAMS = 2 ** 16   # stream ids are u16; streams past this are sent as JSON
+_U32_MAX = 2 ** 32 - 1
+_I32_MIN, _I32_MAX = -2 ** 31, 2 ** 31 - 1
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_json(data: Dict[str, Any]) -> str:
+    """Same compact encoding Starlette's send_json uses, done once per broadcast."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def negotiate(subprotocols, query_encoding: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Returns (encoding, subprotocol to echo back in the handshake)."""
+    for offered in subprotocols or []:
+        if offered.startswith(SUBPROTOCOL_PREFIX) and offered[len(SUBPROTOCOL_PREFIX):] in ENCODINGS:
+            return offered[len(SUBPROTOCOL_PREFIX):], offered
+    if query_encoding in ENCODINGS:
+        return query_encoding, None
+    return "json", None
+
+
+def _epoch_ms(timestamp: Any) -> Optional[int]:
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime):
+        return None
+    if timestamp.tzinfo is None:
+        # Ticks are stamped with naive utcnow()
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int((timestamp - _EPOCH).total_seconds() * 1000)
+
+
+def _short(text: Any) -> bytes:
+    return str(text or "").encode()[:255]
+
+
+class Tick:
+    """
+    One broadcast tick, shared by every client. The JSON frame is built once; compact
+    frames depend on what the client last received for this stream, so they are
+    built on first use per (encoding, base) and shared by clients in the same state.
+    """
+
+    __slots__ = ("data", "frame", "stream_id", "time_ms", "price_fixed", "_encoded")
+
+    def __init__(self, data: Dict[str, Any], stream_id: Optional[int]):
+        self.data = data
+        self.frame = encode_json(data)
+        self.stream_id = stream_id
+        self.time_ms = _epoch_ms(data.get("timestamp"))
+        price = parse_price(data.get("price"))
+        self.price_fixed = round(price * PRICE_SCALE) if price is not None else None
+        self._encoded: Dict[Tuple[str, Optional[Tuple[int, int]]], bytes] = {}
+
+    @property
+    def compactable(self) -> bool:
+        return self.stream_id is not None and self.time_ms is not None and self.price_fixed is not None
+
+    @property
+    def state(self) -> Tuple[int, int]:
+        """What a client knows about this stream after receiving the tick."""
+        return (self.time_ms, self.price_fixed)
+
+    def encode(self, encoding: str, base: Optional[Tuple[int, int]]) -> bytes:
+        """Delta against `base` when it fits, otherwise a key frame."""
+        if base is not None:
+            dt, dp = self.time_ms - base[0], self.price_fixed - base[1]
+            if not (0 <= dt <= _U32_MAX and _I32_MIN <= dp <= _I32_MAX):
+                base = None
+        cache_key = (encoding, base)
+        encoded = self._encoded.get(cache_key)
+        if encoded is not None:
+            return encoded
+
+        source, symbol = self.data.get("source"), self.data.get("symbol")
+        if encoding == "msgpack":
+            if base is None:
+                body = [FRAME_KEY, self.stream_id, self.time_ms, self.price_fixed, source, symbol]
+            else:
+                body = [FRAME_DELTA, self.stream_id, dt, dp]
+            encoded = msgpack.packb(body)
+        elif base is None:
+            source_bytes, symbol_bytes = _short(source), _short(symbol)
+            encoded = b"".join((
+                KEY_HEADER.pack(FRAME_KEY, self.stream_id, self.time_ms, self.price_fixed),
+                bytes((len(source_bytes),)), source_bytes,
+                bytes((len(symbol_bytes),)), symbol_bytes,
+            ))
+        else:
+            encoded = DELTA.pack(FRAME_DELTA, self.stream_id, dt, dp)
+        self._encoded[cache_key] = encoded
+        return encoded
+
+
+def decode(encoding: str, frame: bytes, state: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Reference decoder for clients (and the benchmark). `state` is per connection."""
+    if encoding == "msgpack":
+        fields = msgpack.unpackb(frame)
+        kind, stream_id = fields[0], fields[1]
+        if kind == FRAME_KEY:
+            time_ms, price_fixed, source, symbol = fields[2:6]
+        else:
+            prev = state[stream_id]
+            time_ms, price_fixed = prev["time_ms"] + fields[2], prev["price_fixed"] + fields[3]
+            source, symbol = prev["source"], prev["symbol"]
+    elif frame[0] == FRAME_KEY:
+        _, stream_id, time_ms, price_fixed = KEY_HEADER.unpack_from(frame)
+        offset = KEY_HEADER.size
+        source = frame[offset + 1:offset + 1 + frame[offset]].decode()
+        offset += 1 + frame[offset]
+        symbol = frame[offset + 1:offset + 1 + frame[offset]].decode()
+    else:
+        _, stream_id, dt, dp = DELTA.unpack(frame)
+        prev = state[stream_id]
+        time_ms, price_fixed = prev["time_ms"] + dt, prev["price_fixed"] + dp
+        source, symbol = prev["source"], prev["symbol"]
+    state[stream_id] = {"time_ms": time_ms, "price_fixed": price_fixed, "source": source, "symbol": symbol}
+    return {
+        "price": price_fixed / PRICE_SCALE,
+        "source": source,
+        "symbol": symbol,
+        "timestamp": datetime.utcfromtimestamp(time_ms / 1000).isoformat(),
+    }
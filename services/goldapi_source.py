@@ -0,0 +1,193 @@
+# services/goldapi_source.py
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from config.settings import settings
+from services.repositories.api_usage_repo import ApiUsageRepository
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from pymongo.errors import PyMongoError
+
+import httpx
+
+
+def _month_bounds(now: datetime) -> Tuple[datetime, datetime]:
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+class RequestBudget:
+    """
+    Spreads a monthly request quota evenly over the rest of the month.
+    After each request the next one is allowed once `remaining time / remaining
+    requests` has passed, so the quota lasts until the month rolls over.
+    The counters can be seeded from the shared per-month usage document, so the
+    pacing carries over restarts and is the same in every process.
+    """
+
+    def __init__(self, monthly_quota: int, reserve: int = 0):
+        self.monthly_quota = monthly_quota
+        self.reserve = reserve
+        self.used: int = 0
+        self.month: Optional[Tuple[int, int]] = None
+        self.next_allowed_at: Optional[datetime] = None
+        self.exhausted: bool = False
+
+    def _roll_month(self, now: datetime):
+        if self.month != (now.year, now.month):
+            self.month = (now.year, now.month)
+            self.used = 0
+            self.next_allowed_at = None
+            self.exhausted = False
+
+    def _schedule_after(self, requested_at: datetime):
+        _, month_end = _month_bounds(requested_at)
+        remaining = self.remaining()
+        if remaining > 0:
+            self.next_allowed_at = requested_at + (month_end - requested_at) / remaining
+
+    def load(self, usage: Optional[Dict[str, Any]]):
+        """Adopts this month's persisted usage (`used`, `last_request_at`, `exhausted`)."""
+        self._roll_month(datetime.now(timezone.utc))
+        usage = usage or {}
+        self.used = usage.get("used", 0)
+        self.exhausted = usage.get("exhausted", False)
+        self.next_allowed_at = None
+        last = usage.get("last_request_at")
+        if last is not None:
+            # Mongo hands datetimes back naive, in UTC
+            self._schedule_after(last.replace(tzinfo=timezone.utc) if last.tzinfo is None else last)
+
+    def remaining(self) -> int:
+        return max(0, self.monthly_quota - self.reserve - self.used)
+
+    def seconds_until_allowed(self) -> float:
+        """How long to wait before the next request fits in the budget."""
+        now = datetime.now(timezone.utc)
+        self._roll_month(now)
+        if self.exhausted or self.remaining() <= 0:
+            _, month_end = _month_bounds(now)
+            return (month_end - now).total_seconds()
+        if self.next_allowed_at is None:
+            return 0.0
+        return max(0.0, (self.next_allowed_at - now).total_seconds())
+
+    def try_acquire(self) -> bool:
+        if self.seconds_until_allowed() > 0:
+            return False
+        self.used += 1
+        self._schedule_after(datetime.now(timezone.utc))
+        return True
+
+    def mark_exhausted(self):
+        """The provider rejected us for quota; stop until the month rolls over."""
+        self.exhausted = True
+
+
+class GoldApiSource:
+    """Async GoldAPI.io client with a keep-alive connection pool and a quota budget."""
+
+    label = "GoldAPI.io"
+
+    def __init__(self):
+        self.budget = RequestBudget(settings.GOLDAPI_MONTHLY_QUOTA, settings.GOLDAPI_QUOTA_RESERVE)
+        self.client: Optional[httpx.AsyncClient] = None
+        self.usage_repo = ApiUsageRepository("GOLDAPI")
+        self.mongo_client: Optional[MongoClient] = None
+        self.budget_denied = False   # the last fetch was turned away by the quota, not failed
+
+    # --- Shared quota ---
+    @staticmethod
+    def _month_key() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+
+    async def load_usage(self, mongo_client: MongoClient):
+        """Seeds the budget from this month's usage counter; later requests are counted there too."""
+        self.mongo_client = mongo_client
+        try:
+            self.budget.load(await self.usage_repo.get_usage(mongo_client, self._month_key()))
+            print(f"GoldAPI budget: {self.budget.used} requests used this month, {self.budget.remaining()} left.")
+        except PyMongoError as e:
+            print(f"Could not load GoldAPI usage ({e}); pacing from this process only.")
+
+    async def _acquire(self) -> bool:
+        """Takes one request from the budget, counted in Mongo so every process shares the quota."""
+        # Usage only grows within a month, so a local denial holds for the shared count
+        # too; skip the Mongo round trip on every denied poll
+        if self.budget.seconds_until_allowed() > 0:
+            return False
+        if self.mongo_client is None:
+            return self.budget.try_acquire()
+        month = self._month_key()
+        try:
+            # Another replica, worker or previous run may have spent requests since
+            self.budget.load(await self.usage_repo.get_usage(self.mongo_client, month))
+            if self.budget.seconds_until_allowed() > 0:
+                return False
+            if not await self.usage_repo.claim_request(
+                self.mongo_client, month, self.budget.used, datetime.now(timezone.utc)
+            ):
+                return False
+        except PyMongoError as e:
+            print(f"GoldAPI usage counter unavailable ({e}); pacing from this process only.")
+        return self.budget.try_acquire()
+
+    async def _mark_exhausted(self):
+        self.budget.mark_exhausted()
+        if self.mongo_client is not None:
+            try:
+                await self.usage_repo.mark_exhausted(self.mongo_client, self._month_key())
+            except PyMongoError:
+                pass
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=settings.API_BASE_URL,
+                headers={'x-access-token': settings.API_KEY},
+                timeout=settings.GOLDAPI_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.GOLDAPI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GOLDAPI_MAX_CONNECTIONS,
+                ),
+            )
+        return self.client
+
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch_price(self) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (price, source) or (None, None) when the budget or the API says no."""
+        self.budget_denied = False
+        if not await self._acquire():
+            self.budget_denied = True
+            return None, None
+
+        try:
+            response = await self._get_client().get(f"/{settings.API_SYMBOL}")
+            if response.status_code == 429:
+                print("GoldAPI quota rejected (429). Pausing until next month.")
+                await self._mark_exhausted()
+                self.budget_denied = True
+                return None, None
+            response.raise_for_status()
+            data = response.json()
+
+            if 'price' in data:
+                price_value = data['price']
+                return f"{price_value:.2f}", self.label
+
+            print(f"Warning: GoldAPI response missing 'price' key. Full response: {data}")
+            return None, None
+
+        except httpx.HTTPError as e:
+            print(f"GoldAPI Request FAILED: {e}")
+            return None, None
+        except Exception as e:
+            print(f"GoldAPI Parsing Error: {e}")
+            return None, None
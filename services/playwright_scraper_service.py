@@ -1,94 +1,359 @@
 # services/playwright_scraper_service.py
 
 import asyncio
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from config.settings import settings
 from services.repositories.price_repo import PriceRepository
 from services.websocket_manager import manager as ws_manager
+from services.tick_buffer import tick_buffer
+from services.shared_tick import shared_tick
+from services.request_blocking import BlockingRules, RequestBlocker
+from services.browser_pool import BrowserContextPool, PooledPage
+from services.goldapi_source import GoldApiSource
+from services.change_detector import ChangeDetector
+from services.candle_rollup import CandleRollup
+from services.poll_scheduler import MarketCalendar, PollScheduler
+from services.repositories.candle_repo import CandleRepository
 from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
 
-from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Browser, TimeoutError as PlaywrightTimeoutError
+
+# Browser sources by settings prefix: (source label, URL setting, selector setting)
+BROWSER_SOURCE_DEFINITIONS: Dict[str, Tuple[str, str, str]] = {
+    "FAILOVER": ("IG.com (Playwright)", "FAILOVER_URL", "FAILOVER_CSS_SELECTOR"),
+    "TARGET": ("TradingView (Playwright)", "TARGET_URL", "PRICE_CSS_SELECTOR"),
+}
+
+
+@dataclass
+class BrowserSource:
+    """A page-scraped price source and its polling state."""
+    key: str
+    label: str
+    url: str
+    selector: str
+    blocker: RequestBlocker
+    last_seen_text: Optional[str] = None
+    last_change_at: float = field(default_factory=time.monotonic)
+    consecutive_errors: int = 0
+
+    @classmethod
+    def from_settings(cls, key: str) -> "BrowserSource":
+        label, url_setting, selector_setting = BROWSER_SOURCE_DEFINITIONS[key]
+        return cls(
+            key=key,
+            label=label,
+            url=getattr(settings, url_setting),
+            selector=getattr(settings, selector_setting),
+            blocker=RequestBlocker(BlockingRules.from_settings(key)),
+        )
 
 
 class PlaywrightGoldScrapingService:
     def __init__(self, repo: PriceRepository):
         self.repo = repo
-        self.browser: Optional[Browser] = None
+        self.pool = BrowserContextPool(settings.BROWSER_POOL_SIZE)
+        self.sources: List[BrowserSource] = [
+            BrowserSource.from_settings(key) for key in settings.BROWSER_SOURCES
+        ]
+        self.api_source: Optional[GoldApiSource] = (
+            GoldApiSource() if settings.GOLDAPI_MODE != "off" else None
+        )
+        self.change_detector = ChangeDetector.from_settings()
+        self.calendar = MarketCalendar.from_settings()
+        self.schedulers: Dict[str, PollScheduler] = {}
+        self.has_fanned_out = False
+        self.candles: Optional[CandleRollup] = (
+            CandleRollup(CandleRepository()) if settings.CANDLES_ENABLED else None
+        )
 
-    # --- Setup Browser ---
-    async def _setup_browser(self) -> Tuple[Browser, Page]:
-        if not self.browser:
-            p = await async_playwright().start()
-            self.browser = await p.chromium.launch(headless=True)
-        page = await self.browser.new_page()
-        await page.set_viewport_size({"width": 1400, "height": 900})
-        return self.browser, page
+    @property
+    def browser(self) -> Optional[Browser]:
+        return self.pool.browser
 
     # --- Close Browser ---
     async def _close_browser(self):
-        if self.browser:
-            await self.browser.close()
-            print("Playwright Browser closed.")
-            self.browser = None
+        await self.pool.close()
+
+    async def close(self, mongo_client: Optional[MongoClient] = None):
+        """Releases the browser pool and the GoldAPI connection pool, and stores open candles."""
+        await self._close_browser()
+        if self.api_source:
+            await self.api_source.close()
+        if self.candles and mongo_client is not None:
+            await self.candles.flush(mongo_client)
+
+    # --- Navigation helpers ---
+    async def _open_source_page(self, source: BrowserSource, slot: PooledPage):
+        """Navigates the pooled page to the source and dismisses the consent dialog."""
+        page = slot.page
+        # Route handlers live as long as the page: attach once, and swap them only
+        # when the slot moves to another source so requests are credited correctly.
+        if slot.blocker is not source.blocker:
+            if slot.blocker is not None:
+                await slot.blocker.detach(page)
+            await source.blocker.attach(page)
+            slot.blocker = source.blocker
+        await page.goto(source.url, wait_until="domcontentloaded", timeout=60000)
+
+        # Handle cookie/consent popup
+        try:
+            consent_locator = page.locator(
+                "button:has-text('Accept'):visible, button:has-text('OK'):visible"
+            )
+            await consent_locator.click(timeout=5000)
+        except PlaywrightTimeoutError:
+            pass
+        source.blocker.print_report()
+
+        slot.mark_navigated(source.key)
+        source.last_seen_text = None
+        source.last_change_at = time.monotonic()
+        source.consecutive_errors = 0
+
+    async def _read_price_text(self, source: BrowserSource, slot: PooledPage, timeout: int = 30000) -> str:
+        price_locator = slot.page.locator(source.selector)
+        await price_locator.wait_for(state="visible", timeout=timeout)
+        current_price = await price_locator.inner_text()
+        return current_price.strip()
+
+    def _needs_navigation(self, source: BrowserSource, slot: PooledPage) -> bool:
+        """True when the pooled page cannot be read in place for this source."""
+        if not settings.SCRAPER_PERSISTENT_PAGE or slot.source != source.key:
+            return True
+        now = time.monotonic()
+        if now - slot.navigated_at > settings.PAGE_MAX_AGE_SECONDS:
+            print(f"[{source.key}] Live page reached max age. Re-navigating.")
+            return True
+        if source.last_seen_text is not None and now - source.last_change_at > settings.PAGE_STALE_SECONDS:
+            print(f"[{source.key}] Live page price has not moved. Re-navigating.")
+            return True
+        return source.consecutive_errors >= settings.PAGE_MAX_ERRORS
 
     # --- Scrape price from website ---
-    async def _fetch_scraping_price_async(self) -> Optional[Tuple[str, str]]:
-        page: Optional[Page] = None
+    async def _fetch_source_price_async(self, source: BrowserSource) -> Optional[Tuple[str, str]]:
+        """
+        Reads the price for one source from a pooled page. In persistent mode the
+        already-loaded DOM is read in place and navigation only happens when needed.
+        """
         try:
-            _, page = await self._setup_browser()
-            await page.goto(settings.FAILOVER_URL, wait_until="domcontentloaded", timeout=60000)
+            async with self.pool.page(source.key) as slot:
+                navigated = self._needs_navigation(source, slot)
+                if navigated:
+                    try:
+                        await self._open_source_page(source, slot)
+                    except Exception:
+                        # Half-loaded page: the next attempt must navigate again
+                        slot.invalidate()
+                        raise
 
-            # Handle cookie/consent popup
-            try:
-                consent_locator = page.locator(
-                    "button:has-text('Accept'):visible, button:has-text('OK'):visible"
+                # A live page already has the node rendered, so a short wait is enough
+                current_price = await self._read_price_text(
+                    source, slot, timeout=30000 if navigated else 5000
                 )
-                await consent_locator.click(timeout=5000)
-            except PlaywrightTimeoutError:
-                pass
-
-            price_selector = settings.FAILOVER_CSS_SELECTOR
-            price_locator = page.locator(price_selector)
-            await price_locator.wait_for(state="visible", timeout=30000)
+                if not settings.SCRAPER_PERSISTENT_PAGE:
+                    slot.invalidate()
 
-            current_price = await price_locator.inner_text()
-            return current_price.strip(), "IG.com (Playwright)"
+            if current_price != source.last_seen_text:
+                source.last_seen_text = current_price
+                source.last_change_at = time.monotonic()
+            source.consecutive_errors = 0
+            return current_price, source.label
 
         except PlaywrightTimeoutError as e:
-            print(f"Scraping Timeout: {e}")
+            source.consecutive_errors += 1
+            print(f"[{source.key}] Scraping Timeout ({source.consecutive_errors}/{settings.PAGE_MAX_ERRORS}): {e}")
             return None, None
         except Exception as e:
-            print(f"Scraping Error: {e}")
+            source.consecutive_errors += 1
+            print(f"[{source.key}] Scraping Error ({source.consecutive_errors}/{settings.PAGE_MAX_ERRORS}): {e}")
             return None, None
-        finally:
-            if page:
-                await page.close()
 
-    # --- Main async scraping loop ---
-    async def run_scraper_loop_async(self, mongo_client: MongoClient):
-        # Inside run_scraper_loop_async
+    async def _fetch_scraping_price_async(self) -> Optional[Tuple[str, str]]:
+        """Single-shot read from the first configured browser source."""
+        return await self._fetch_source_price_async(self.sources[0])
+
+    async def _fetch_with_api_primary(self, source: BrowserSource) -> Tuple[Optional[str], Optional[str]]:
+        """Tries GoldAPI while its budget allows, then falls back to the browser page."""
+        current_price, current_source = await self.api_source.fetch_price()
+        if current_price:
+            return current_price, current_source
+        return await self._fetch_source_price_async(source)
+
+    # --- Publishing ---
+    async def _publish(self, mongo_client: MongoClient, current_price: str, current_source: str):
+        now = datetime.utcnow()
+        tick = {
+            "price": current_price,
+            "source": current_source,
+            "symbol": settings.API_SYMBOL,
+            "timestamp": now.isoformat(),
+        }
+
+        # Drop ticks that repeat the source's last published price
+        if not self.change_detector.should_publish(current_price, current_source):
+            # After a restart the price is already stored, but clients still need a first value
+            if not self.has_fanned_out:
+                await self._fan_out(mongo_client, tick, now)
+            return
+
+        # Save to MongoDB (queued for a batched insert when write-behind is on)
+        if settings.PRICE_WRITE_BEHIND:
+            self.repo.buffer_price(mongo_client, current_price, current_source)
+        else:
+            await self.repo.save_price(mongo_client, current_price, current_source)
+
+        # Roll the tick into the open OHLC buckets
+        if self.candles:
+            self.candles.update(mongo_client, current_price, current_source, now)
+
+        await self._fan_out(mongo_client, tick, now)
+
+    async def _fan_out(self, mongo_client: MongoClient, tick: dict, now: datetime):
+        """Delivers a tick to clients: in-process, or via the live-tick feed every replica tails."""
+        self.has_fanned_out = True
+        if settings.TICK_FANOUT == "change_stream":
+            await self.repo.publish_live_tick(mongo_client, {**tick, "timestamp": now})
+            return
+        if settings.TICK_FANOUT == "shared_memory":
+            # Other uvicorn workers on this host pick it up from the segment
+            shared_tick.publish(tick, now)
+
+        # Keep it in the in-memory recent window
+        tick_buffer.add_tick(tick["price"], tick["source"], now)
+
+        # Broadcast immediately to all websocket clients
+        await ws_manager.broadcast(tick)
+
+    # --- Scheduling ---
+    async def _wait_for_market(self, key: str):
+        """Sleeps through market closures (in chunks, so calendar edge cases recheck)."""
+        was_closed = False
+        while not self.calendar.is_open():
+            if not was_closed:
+                opens = self.calendar.next_open()
+                print(f"[{key}] Market closed; polling paused until {opens.isoformat() if opens else 'unknown'}.")
+                was_closed = True
+            await asyncio.sleep(
+                max(1.0, min(self.calendar.seconds_until_open(), settings.MARKET_CLOSED_RECHECK_SECONDS))
+            )
+        if was_closed:
+            print(f"[{key}] Market open; polling resumed.")
+
+    async def _poll_forever(self, key: str, fetch, mongo_client: MongoClient, min_wait=None, budget_denied=None):
+        """
+        Fetch/publish loop for one source. The first poll runs even when the market is
+        closed so clients get the closing price; after that the loop sleeps through
+        closures and waits scheduler.next_delay() between polls. `min_wait()`, when given,
+        is an extra wait before each fetch (the GoldAPI quota pacing). When
+        `budget_denied()` says an empty fetch was the quota saying no, that is not a
+        failure: the loop waits for the budget instead of backing off.
+        """
+        scheduler = self.schedulers[key] = PollScheduler.from_settings(key)
+        first = True
         while True:
+            if not first:
+                await self._wait_for_market(key)
+            first = False
+            if min_wait:
+                wait = min_wait()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            denied = False
             try:
-                # Scrape
-                current_price, current_source = await self._fetch_scraping_price_async()
+                current_price, current_source = await fetch()
+                if current_price:
+                    scheduler.record_success(current_price)
+                    await self._publish(mongo_client, current_price, current_source)
+                elif budget_denied and budget_denied():
+                    denied = True
+                else:
+                    scheduler.record_failure()
+            except Exception as e:
+                print(f"[{key}] Critical error in scraper loop: {e}")
+                scheduler.record_failure()
+
+            if denied:
+                # Out of budget is not an outage: wait until the budget allows the next request
+                delay = max(min_wait() if min_wait else 0.0, scheduler.interval())
+                print(f"[{key}] Request budget denied; next attempt in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+                continue
+
+            delay = scheduler.next_delay()
+            if scheduler.failures:
+                print(f"[{key}] {scheduler.failures} consecutive failures; retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+
+    # --- Per-source polling loop ---
+    async def _run_source_loop(self, mongo_client: MongoClient, source: BrowserSource):
+        use_api_first = (
+            self.api_source is not None
+            and settings.GOLDAPI_MODE == "primary"
+            and source is self.sources[0]
+        )
+
+        async def fetch():
+            if use_api_first:
+                return await self._fetch_with_api_primary(source)
+            return await self._fetch_source_price_async(source)
 
-                if not current_price:
-                    await asyncio.sleep(settings.SCRAPE_INTERVAL_SECONDS)
-                    continue
+        await self._poll_forever(source.key, fetch, mongo_client)
 
-                # Save to MongoDB immediately
-                await self.repo.save_price(mongo_client, current_price, current_source)
+    async def _run_api_loop(self, mongo_client: MongoClient):
+        """Polls GoldAPI on its own, no faster than the monthly budget allows."""
+        await self._poll_forever(
+            "GOLDAPI", self.api_source.fetch_price, mongo_client,
+            min_wait=self.api_source.budget.seconds_until_allowed,
+            budget_denied=lambda: self.api_source.budget_denied,
+        )
 
-                # Broadcast immediately to all websocket clients
-                await ws_manager.broadcast({
-                    "price": current_price,
-                    "source": current_source,
-                    "timestamp": datetime.utcnow().isoformat(),
-                })
+    # --- Stats ---
+    def stats(self) -> dict:
+        return {
+            "change_detection": self.change_detector.stats(),
+            "polling": {key: scheduler.stats() for key, scheduler in self.schedulers.items()},
+            "pool": self.pool.stats(),
+            "write_buffer": self.repo.write_buffer.stats(),
+        }
 
-                # Wait interval
-                await asyncio.sleep(settings.SCRAPE_INTERVAL_SECONDS)
+    async def _log_stats_forever(self):
+        """Periodic summary, so a scraper in a worker process still reports its counters."""
+        while True:
+            await asyncio.sleep(settings.SCRAPER_STATS_LOG_SECONDS)
+            change = self.change_detector.stats()
+            print(
+                f"Scraper stats: {change['passed']} ticks published, {change['heartbeats']} heartbeats, "
+                f"{change['suppressed']} unchanged ticks suppressed {change['suppressed_by_source']}."
+            )
+
+    # --- Main async scraping loop ---
+    async def run_scraper_loop_async(self, mongo_client: MongoClient):
+        """Polls every configured source concurrently, each on its own schedule."""
+        print(
+            f"Scraper started for sources {[s.key for s in self.sources]} "
+            f"(pool size {self.pool.size}, GoldAPI {settings.GOLDAPI_MODE})."
+        )
+        try:
+            self.change_detector.seed(await self.repo.get_last_price(mongo_client))
+        except Exception as e:
+            print(f"Could not seed change detection from last price: {e}")
+
+        if self.api_source:
+            await self.api_source.load_usage(mongo_client)
+
+        if self.candles:
+            try:
+                await self.candles.rebuild(mongo_client, self.repo)
             except Exception as e:
-                print(f"Critical error in scraper loop: {e}")
-                await asyncio.sleep(3)  # small delay to avoid busy loop on error
+                print(f"Could not rebuild open candles: {e}")
+
+        loops = [self._run_source_loop(mongo_client, source) for source in self.sources]
+        if self.api_source and (settings.GOLDAPI_MODE == "parallel" or not self.sources):
+            loops.append(self._run_api_loop(mongo_client))
+        if settings.SCRAPER_STATS_LOG_SECONDS:
+            loops.append(self._log_stats_forever())
+        await asyncio.gather(*loops)
@@ -0,0 +1,201 @@
+# services/poll_scheduler.py
+
+import math
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from config.settings import settings
+from services.change_detector import parse_price
+
+_DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_MINUTES_PER_WEEK = 7 * 1440
+
+
+def _parse_hhmm(text: str) -> int:
+    hours, minutes = text.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _parse_week_minute(text: str) -> int:
+    """'Sun 18:00' -> minutes since Monday 00:00."""
+    day, hhmm = text.split()
+    return _DAYS.index(day.strip().lower()[:3]) * 1440 + _parse_hhmm(hhmm)
+
+
+class MarketCalendar:
+    """
+    Weekly trading window in the market's own time zone, with an optional daily
+    maintenance break and full-day holidays. The defaults follow spot gold: Sunday
+    18:00 to Friday 17:00 New York time, closed 17:00-18:00 on weekdays.
+    """
+
+    def __init__(
+        self,
+        tz_name: str,
+        weekly_open: str,
+        weekly_close: str,
+        daily_break: Optional[str] = None,
+        holidays: Optional[Set[date]] = None,
+        enabled: bool = True,
+    ):
+        try:
+            self.tz = ZoneInfo(tz_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            if enabled:
+                # Falling back to UTC would shift every window by hours and poll a closed market
+                raise ValueError(
+                    f"Market time zone '{tz_name}' not found; install tzdata or fix MARKET_TIMEZONE."
+                )
+            self.tz = timezone.utc   # never consulted while market hours are disabled
+        self.open_minute = _parse_week_minute(weekly_open)
+        self.close_minute = _parse_week_minute(weekly_close)
+        self.break_window: Optional[Tuple[int, int]] = None
+        if daily_break:
+            start, end = daily_break.split("-")
+            self.break_window = (_parse_hhmm(start), _parse_hhmm(end))
+        self.holidays = holidays or set()
+        self.enabled = enabled
+
+    @classmethod
+    def from_settings(cls) -> "MarketCalendar":
+        return cls(
+            tz_name=settings.MARKET_TIMEZONE,
+            weekly_open=settings.MARKET_WEEKLY_OPEN,
+            weekly_close=settings.MARKET_WEEKLY_CLOSE,
+            daily_break=settings.MARKET_DAILY_BREAK,
+            holidays={date.fromisoformat(d) for d in settings.MARKET_HOLIDAYS},
+            enabled=settings.MARKET_HOURS_ENABLED,
+        )
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        if not self.enabled:
+            return True
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        if local.date() in self.holidays:
+            return False
+        minute_of_day = local.hour * 60 + local.minute
+        week_minute = local.weekday() * 1440 + minute_of_day
+        if self.open_minute > self.close_minute:
+            in_week = week_minute >= self.open_minute or week_minute < self.close_minute
+        else:
+            in_week = self.open_minute <= week_minute < self.close_minute
+        if not in_week:
+            return False
+        if self.break_window:
+            start, end = self.break_window
+            if start <= minute_of_day < end:
+                return False
+        return True
+
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """First minute at or after `now` when the market is open (None if not within two weeks)."""
+        now = now or datetime.now(timezone.utc)
+        if self.is_open(now):
+            return now
+        candidate = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(2 * _MINUTES_PER_WEEK):
+            if self.is_open(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        return None
+
+    def seconds_until_open(self, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        opens = self.next_open(now)
+        if opens is None:
+            return float(settings.MARKET_CLOSED_RECHECK_SECONDS)
+        return max(0.0, (opens - now).total_seconds())
+
+
+class PollScheduler:
+    """
+    Per-source polling delay. While healthy, the interval is sized so the price is
+    expected to move about POLL_TARGET_MOVE_BPS between polls, from an EWMA of the
+    per-second variance of recent log returns: volatile markets are polled up to
+    POLL_MIN_INTERVAL_SECONDS apart, flat ones stretch to POLL_MAX_INTERVAL_SECONDS.
+    After failures it backs off exponentially with jitter instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        target_move_bps: float,
+        window: int,
+        backoff_base: float,
+        backoff_max: float,
+    ):
+        self.name = name
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_move_bps = target_move_bps
+        self.alpha = 2.0 / (max(1, window) + 1)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.last_value: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.variance_per_second: Optional[float] = None   # bps^2 per second
+        self.samples = 0
+        self.failures = 0
+
+    @classmethod
+    def from_settings(cls, name: str) -> "PollScheduler":
+        return cls(
+            name=name,
+            base_interval=settings.SCRAPE_INTERVAL_SECONDS,
+            min_interval=settings.POLL_MIN_INTERVAL_SECONDS,
+            max_interval=settings.POLL_MAX_INTERVAL_SECONDS,
+            target_move_bps=settings.POLL_TARGET_MOVE_BPS,
+            window=settings.POLL_VOLATILITY_WINDOW,
+            backoff_base=settings.POLL_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.POLL_BACKOFF_MAX_SECONDS,
+        )
+
+    def record_success(self, price: str, now: Optional[float] = None):
+        self.failures = 0
+        value = parse_price(price)
+        now = time.monotonic() if now is None else now
+        if value is None or value <= 0:
+            return
+        if self.last_value is not None and now > self.last_at:
+            move_bps = math.log(value / self.last_value) * 1e4
+            observed = move_bps * move_bps / (now - self.last_at)
+            if self.variance_per_second is None:
+                self.variance_per_second = observed
+            else:
+                self.variance_per_second += self.alpha * (observed - self.variance_per_second)
+            self.samples += 1
+        self.last_value, self.last_at = value, now
+
+    def record_failure(self):
+        self.failures += 1
+
+    def backoff_delay(self) -> float:
+        """Exponential backoff with equal jitter: half fixed, half random."""
+        # Clamp the exponent: a source that stays down for days would overflow the float
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** min(self.failures - 1, 30))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def interval(self) -> float:
+        if self.samples < 3 or self.variance_per_second is None:
+            return self.base_interval
+        if self.variance_per_second <= 0:
+            return self.max_interval
+        ideal = self.target_move_bps ** 2 / self.variance_per_second
+        return min(self.max_interval, max(self.min_interval, ideal))
+
+    def next_delay(self) -> float:
+        return self.backoff_delay() if self.failures else self.interval()
+
+    def stats(self) -> dict:
+        return {
+            "interval": round(self.interval(), 3),
+            "failures": self.failures,
+            "volatility_bps_per_sqrt_s": round(math.sqrt(self.variance_per_second), 4)
+            if self.variance_per_second else 0.0,
+        }
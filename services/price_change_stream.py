@@ -0,0 +1,82 @@
+# services/price_change_stream.py
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config.settings import settings
+from services.websocket_manager import ConnectionManager
+from services.tick_buffer import tick_buffer
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class PriceChangeStreamListener:
+    """
+    Tails the live-tick collection with a change stream and feeds this replica's
+    ConnectionManager, so every API process can serve sockets while only one
+    process scrapes. After a dropped connection it resumes from the last resume
+    token. Needs a replica set; a single-node one
+    (`mongod --replSet rs0` + `rs.initiate()`) is enough locally.
+    """
+
+    def __init__(self, client: MongoClient, manager: ConnectionManager):
+        self.client = client
+        self.manager = manager
+        self.resume_token: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+        self.received: int = 0
+        self.reconnects: int = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _deliver(self, doc: Dict[str, Any]):
+        timestamp = doc.get("timestamp")
+        if isinstance(timestamp, datetime):
+            tick_buffer.add_tick(doc.get("price"), doc.get("source", "N/A"), timestamp)
+            timestamp = timestamp.isoformat()
+        await self.manager.broadcast({
+            "price": doc.get("price"),
+            "source": doc.get("source"),
+            "symbol": doc.get("symbol"),
+            "timestamp": timestamp,
+        })
+        self.received += 1
+
+    async def run(self):
+        collection = self.client[settings.MONGO_DB].get_collection(settings.LIVE_TICK_COLLECTION)
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        backoff = 1.0
+        while True:
+            try:
+                async with collection.watch(pipeline, resume_after=self.resume_token) as stream:
+                    print("Live tick change stream open" + (" (resumed)." if self.resume_token else "."))
+                    backoff = 1.0
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        await self._deliver(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    # The oplog moved past our token; old ticks are not worth replaying
+                    print("Change stream resume point lost; restarting from now.")
+                    self.resume_token = None
+                else:
+                    print(f"Change stream error: {e}")
+            except PyMongoError as e:
+                print(f"Change stream connection error: {e}")
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(30.0, backoff * 2)
@@ -0,0 +1,47 @@
+from config.settings import settings
+from datetime import datetime
+from typing import Dict, Any, Optional
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class ApiUsageRepository:
+    """
+    One counter document per external API and month (`_id` "GOLDAPI:2025-01"), so
+    a quota is shared by every process and survives restarts.
+    """
+
+    def __init__(self, api: str):
+        self.api = api
+        self.collection_name = settings.API_USAGE_COLLECTION
+
+    def _collection(self, client: MongoClient):
+        return client[settings.MONGO_DB].get_collection(self.collection_name)
+
+    def _key(self, month: str) -> str:
+        return f"{self.api}:{month}"
+
+    async def get_usage(self, client: MongoClient, month: str) -> Optional[Dict[str, Any]]:
+        return await self._collection(client).find_one({"_id": self._key(month)})
+
+    async def claim_request(self, client: MongoClient, month: str, expected_used: int, now: datetime) -> bool:
+        """
+        Counts one request, but only if nobody else has counted one since this process
+        last read `used`. False means another process got there first.
+        """
+        try:
+            doc = await self._collection(client).find_one_and_update(
+                {"_id": self._key(month), "used": expected_used},
+                {"$inc": {"used": 1}, "$set": {"last_request_at": now}},
+                upsert=expected_used == 0,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return False   # the month's document exists with another count
+        return doc is not None
+
+    async def mark_exhausted(self, client: MongoClient, month: str):
+        await self._collection(client).update_one(
+            {"_id": self._key(month)}, {"$set": {"exhausted": True}, "$setOnInsert": {"used": 0}}, upsert=True
+        )
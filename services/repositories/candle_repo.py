@@ -0,0 +1,60 @@
+from config.settings import settings
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from pymongo import UpdateOne
+
+CANDLE_PROJECTION = {
+    "_id": 0, "interval": 1, "source": 1, "start": 1,
+    "open": 1, "high": 1, "low": 1, "close": 1, "count": 1,
+}
+
+
+class CandleRepository:
+
+    def __init__(self):
+        self.collection_name = settings.CANDLE_COLLECTION
+
+    def _collection(self, client: MongoClient):
+        return client[settings.MONGO_DB].get_collection(self.collection_name)
+
+    async def save_candles(self, client: MongoClient, candles: List[Dict[str, Any]]):
+        """Upserts closed candles keyed by (interval, source, start); replays are harmless."""
+        if not candles:
+            return
+        ops = [
+            UpdateOne(
+                {"interval": c["interval"], "source": c["source"], "start": c["start"]},
+                {"$set": c},
+                upsert=True,
+            )
+            for c in candles
+        ]
+        await self._collection(client).bulk_write(ops, ordered=False)
+
+    async def get_candles(
+        self,
+        client: MongoClient,
+        interval: str,
+        limit: int,
+        source: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns the newest `limit` closed candles in the range, oldest first."""
+        query: Dict[str, Any] = {"interval": interval}
+        if source:
+            query["source"] = source
+        if start or end:
+            query["start"] = {}
+            if start:
+                query["start"]["$gte"] = start
+            if end:
+                query["start"]["$lt"] = end
+
+        docs = await self._collection(client).find(query, CANDLE_PROJECTION) \
+            .sort("start", -1) \
+            .limit(limit) \
+            .to_list(length=limit)
+        docs.reverse()
+        return docs
@@ -1,22 +1,40 @@
 from config.settings import settings
 from datetime import datetime
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from pydantic import Field
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
 # from pymongo import MongoClient
 from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from services.repositories.price_write_buffer import PriceWriteBuffer
 
 class PriceDocument(BaseModel):
     price: str
     source: str = "N/A" # NEW: Add source field
     unit: str = "ounce"
-    timestamp: datetime = datetime.now()
+    symbol: str = settings.API_SYMBOL
+    # default_factory so each document gets its own time, not the import time
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
 
+# Fields returned by read APIs; keeps unit and any future fields off the wire
+PRICE_PROJECTION = {"_id": 1, "price": 1, "source": 1, "symbol": 1, "timestamp": 1}
+
+
 class PriceRepository:
 
     def __init__(self):
         self.collection_name = settings.MONGO_COLLECTION
+        self.write_buffer = PriceWriteBuffer(
+            self._collection,
+            max_batch=settings.PRICE_WRITE_BATCH_SIZE,
+            max_age_seconds=settings.PRICE_WRITE_MAX_AGE_SECONDS,
+            max_pending=settings.PRICE_WRITE_MAX_PENDING,
+        )
+
+    def _collection(self, client: MongoClient):
+        return client[settings.MONGO_DB].get_collection(self.collection_name)
 
     async def save_price(self, client: MongoClient, price_value: str, source: str) -> str:
         """Saves a new price record to MongoDB, including the source."""
@@ -27,6 +45,20 @@ class PriceRepository:
         result = await collection.insert_one(doc)
         return str(result.inserted_id)
 
+    def buffer_price(self, client: MongoClient, price_value: str, source: str) -> Dict[str, Any]:
+        """Queues a price record for the write-behind buffer and returns the document."""
+        doc = PriceDocument(price=price_value, source=source).model_dump()
+        self.write_buffer.add(client, doc)
+        return doc
+
+    async def publish_live_tick(self, client: MongoClient, tick: Dict[str, Any]):
+        """Inserts a tick into the small live-tick feed that API replicas tail with a change stream."""
+        await client[settings.MONGO_DB].get_collection(settings.LIVE_TICK_COLLECTION).insert_one(dict(tick))
+
+    async def flush(self):
+        """Writes any buffered price records and stops the background flusher."""
+        await self.write_buffer.close()
+
     async def get_last_price(self, client: MongoClient) -> Optional[Dict[str, Any]]:
         """Fetches the most recent price document from the database."""
         # db = client.get_database()
@@ -39,3 +71,97 @@ class PriceRepository:
             .limit(1) \
             .to_list(length=1)
         return last_doc[0] if last_doc else None
+
+    async def get_price_history(
+        self,
+        client: MongoClient,
+        limit: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        source: Optional[str] = None,
+        symbol: Optional[str] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        ascending: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns one page of ticks ordered by (timestamp, _id). `after` is the
+        (timestamp, _id) of the last row of the previous page, so every page is an
+        index range scan no matter how deep it is.
+        """
+        return await self._history_cursor(
+            client, limit, start, end, source, symbol, after, ascending
+        ).to_list(length=limit)
+
+    async def explain_price_history(self, client: MongoClient, limit: int, **filters) -> Dict[str, Any]:
+        """The query plan of a get_price_history() call, to check it walks the (…, timestamp, _id) indexes."""
+        return await self._history_cursor(client, limit, **filters).explain()
+
+    def _history_cursor(
+        self,
+        client: MongoClient,
+        limit: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        source: Optional[str] = None,
+        symbol: Optional[str] = None,
+        after: Optional[Tuple[datetime, ObjectId]] = None,
+        ascending: bool = False,
+    ):
+        collection = self._collection(client)
+        query: Dict[str, Any] = {}
+        if source:
+            query["source"] = source
+        if symbol:
+            query["symbol"] = symbol
+        if start or end:
+            query["timestamp"] = {}
+            if start:
+                query["timestamp"]["$gte"] = start
+            if end:
+                query["timestamp"]["$lt"] = end
+        if after:
+            after_ts, after_id = after
+            op = "$gt" if ascending else "$lt"
+            query["$or"] = [
+                {"timestamp": {op: after_ts}},
+                {"timestamp": after_ts, "_id": {op: after_id}},
+            ]
+
+        direction = 1 if ascending else -1
+        return collection.find(query, PRICE_PROJECTION) \
+            .sort([("timestamp", direction), ("_id", direction)]) \
+            .limit(limit)
+
+    async def iter_prices_since(self, client: MongoClient, since: datetime) -> AsyncIterator[Dict[str, Any]]:
+        """Streams ticks newer than `since` in time order, without loading them all at once."""
+        cursor = self._collection(client) \
+            .find({"timestamp": {"$gte": since}}, PRICE_PROJECTION) \
+            .sort("timestamp", 1) \
+            .batch_size(1000)
+        async for doc in cursor:
+            yield doc
+
+    async def get_price_series(
+        self,
+        client: MongoClient,
+        start: datetime,
+        end: datetime,
+        source: Optional[str] = None,
+        limit: int = 100000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Loads a time window's (timestamp, price) pairs in one query, oldest first.
+        When the window holds more than `limit` ticks only the newest `limit` are
+        returned; callers can detect that by asking for one more than they keep.
+        """
+        query: Dict[str, Any] = {"timestamp": {"$gte": start, "$lt": end}}
+        if source:
+            query["source"] = source
+        cursor = self._collection(client) \
+            .find(query, {"_id": 0, "timestamp": 1, "price": 1}) \
+            .sort("timestamp", -1) \
+            .limit(limit) \
+            .batch_size(10000)
+        docs = await cursor.to_list(length=limit)
+        docs.reverse()
+        return docs
@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+from pymongo.errors import BulkWriteError, PyMongoError
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+class PriceWriteBuffer:
+    """
+    Write-behind buffer for price documents. Documents are queued in memory and
+    written with one insert_many(ordered=False) when the batch is full or the
+    oldest document reaches `max_age_seconds`. Documents that failed stay queued
+    and are retried with backoff; past `max_pending` the oldest documents are dropped so
+    memory stays bounded while Mongo is slow.
+    """
+
+    def __init__(self, collection_getter, max_batch: int, max_age_seconds: float, max_pending: int):
+        self._collection_getter = collection_getter
+        self.max_batch = max(1, max_batch)
+        self.max_age_seconds = max_age_seconds
+        self.max_pending = max(self.max_batch, max_pending)
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._client: Optional[MongoClient] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.closed = False
+        self.written: int = 0
+        self.dropped: int = 0
+        self.failed_flushes: int = 0
+
+    def start(self, client: MongoClient):
+        """Starts the background flusher on the running loop (idempotent)."""
+        if self.closed:
+            raise RuntimeError("Price write-behind buffer is closed; no flusher would write this document.")
+        self._client = client
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    def add(self, client: MongoClient, doc: Dict[str, Any]):
+        self.start(client)
+        if len(self._pending) >= self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+        self._pending.append(doc)
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    async def _run(self):
+        backoff = 0.0
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_age_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await self.flush():
+                backoff = 0.0
+            else:
+                backoff = min(30.0, max(1.0, backoff * 2))
+                await asyncio.sleep(backoff)
+
+    async def flush(self) -> bool:
+        """Writes everything queued so far. Returns False if a batch could not be written."""
+        if self._client is None or self._flush_lock is None:
+            return True
+        async with self._flush_lock:
+            while self._pending:
+                batch: List[Dict[str, Any]] = [
+                    self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))
+                ]
+                try:
+                    await self._collection_getter(self._client).insert_many(batch, ordered=False)
+                except asyncio.CancelledError:
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                except BulkWriteError as e:
+                    # With ordered=False every document without a write error was stored.
+                    # Only the failed ones are retried: time-series collections have no
+                    # unique _id index, so resending the whole batch would duplicate ticks.
+                    # Duplicate-key errors mean the document is already there.
+                    errors = e.details.get("writeErrors", [])
+                    failed = [
+                        batch[err["index"]] for err in errors
+                        if err.get("code") != DUPLICATE_KEY_ERROR
+                    ]
+                    self.written += len(batch) - len(errors)
+                    if failed:
+                        self._requeue(failed)
+                        print(f"Price write-behind flush failed ({len(failed)} of {len(batch)} documents). Will retry.")
+                        return False
+                    continue
+                except PyMongoError as e:
+                    self._requeue(batch)
+                    print(f"Price write-behind flush failed: {e}. Will retry.")
+                    return False
+
+                self.written += len(batch)
+        return True
+
+    def _requeue(self, batch: List[Dict[str, Any]]):
+        """Puts a failed batch back at the front, dropping the oldest past max_pending."""
+        self.failed_flushes += 1
+        self._pending.extendleft(reversed(batch))
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+
+    async def close(self):
+        """
+        Stops the flusher and writes whatever is still queued. Stop every producer
+        first: add() raises once the buffer is closed.
+        """
+        self.closed = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not await self.flush():
+            print(f"Price write-behind: {len(self._pending)} documents could not be written on shutdown.")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
@@ -1,10 +1,88 @@
+import re
 from bson import ObjectId
-from typing import Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from config.settings import settings 
-from models.user import UserInDB, UserCreate, UserPublic, UserUpdate, UserRole
+from models.user import UserInDB, UserCreate, UserPublic, UserUpdate, UserRole, BulkUserUpdateItem
 from datetime import datetime
 
+DUPLICATE_KEY = 11000
+
+# Only the UserPublic fields leave the database (never hashed_password)
+USER_PUBLIC_PROJECTION = {
+    field: 1 for field in (
+        "email", "role", "full_name", "created_at", "company", "address", "country", "account_type"
+    )
+}
+
+
+def _sort_spec(sort: str, direction: int) -> List[Tuple[str, int]]:
+    # email is unique, so it orders users on its own and the unique email index
+    # serves the sort; created_at needs _id to break ties
+    if sort == "email":
+        return [("email", direction)]
+    return [(sort, direction), ("_id", direction)]
+
+
+def _user_filter(
+    role: Optional[str] = None,
+    account_type: Optional[str] = None,
+    country: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    query: Dict[str, Any] = {}
+    if role:
+        query["role"] = role
+    if account_type:
+        query["account_type"] = account_type
+    if country:
+        query["country"] = country
+    if email_prefix:
+        # Anchored, case-sensitive prefix regexes can use the email index
+        query["email"] = {"$regex": "^" + re.escape(email_prefix)}
+    if created_after or created_before:
+        query["created_at"] = {}
+        if created_after:
+            query["created_at"]["$gte"] = created_after
+        if created_before:
+            query["created_at"]["$lt"] = created_before
+    return query
+
+
+def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Op index -> message for the failed operations of an unordered bulk_write."""
+    errors = {}
+    for write_error in error.details.get("writeErrors", []):
+        if write_error.get("code") == DUPLICATE_KEY:
+            errors[write_error["index"]] = "Email already registered"
+        else:
+            errors[write_error["index"]] = write_error.get("errmsg", "Write failed")
+    return errors
+
+
+async def _bulk_write(collection, operations) -> Tuple[Dict[int, str], int]:
+    """One unordered bulk_write; returns the per-operation errors and the matched count."""
+    if not operations:
+        return {}, 0
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        return _write_errors(e), e.details.get("nMatched", 0)
+    return {}, result.matched_count
+
+
+def to_public(doc: Dict[str, Any]) -> Optional[UserPublic]:
+    """Projected document -> UserPublic, or None for legacy documents that do not validate."""
+    try:
+        return UserPublic(**{**doc, "_id": str(doc["_id"])})
+    except Exception as e:
+        print(f"Skipping user due to validation error: {e}")
+        return None
+
 class UserRepository:
     def __init__(self, mongo_client: AsyncIOMotorClient):
         self.client = mongo_client
@@ -12,10 +90,10 @@ class UserRepository:
         self.collection = self.db.get_collection("users")
         
     async def create_user(self, user_data: UserCreate, role: UserRole = 'user') -> UserPublic:
-        from security.auth import get_password_hash 
+        from security.auth import get_password_hash_async
         
-        # 1. Hash password
-        hashed_password = get_password_hash(user_data.password)
+        # 1. Hash password (off the event loop)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         # 2. Create DB document
         user_doc = UserInDB(
@@ -46,21 +124,57 @@ class UserRepository:
         return None
 
     # Admin functions (CRUD)
-    async def get_all_users(self) -> List[UserPublic]:
-        users_raw = await self.collection.find().to_list(1000)
-        
-        users_public = []
-        for user_doc in users_raw:
-            if '_id' in user_doc:
-                user_doc['id'] = str(user_doc['_id'])
-                del user_doc['_id'] 
-            try:
-                users_public.append(UserPublic.model_validate(user_doc))
-            except Exception as e:
-                print(f"Skipping user due to validation error: {e}")
-                continue
-                
-        return users_public
+    async def get_users_page(
+        self,
+        limit: int,
+        sort: str = "created_at",
+        ascending: bool = False,
+        after: Optional[Tuple[Any, ObjectId]] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of projected user documents ordered by (sort, _id). `after` is the
+        (sort value, _id) of the previous page's last row, so each page is an index
+        range scan regardless of how many users come before it. A None sort value
+        (a legacy row without it) continues by _id among the rows missing it too.
+        """
+        query = _user_filter(**filters)
+        if after:
+            after_value, after_id = after
+            op = "$gt" if ascending else "$lt"
+            if after_value is None:
+                # Missing values sort lowest: ascending pages then go on to every row that has one
+                keyset = {sort: None, "_id": {op: after_id}}
+                if ascending:
+                    keyset = {"$or": [keyset, {sort: {"$ne": None}}]}
+            elif sort == "email":
+                keyset = {"email": {op: after_value}}
+            else:
+                keyset = {"$or": [
+                    {sort: {op: after_value}},
+                    {sort: after_value, "_id": {op: after_id}},
+                ]}
+                if not ascending:
+                    # Range operators never match a missing value, which sorts last here
+                    keyset["$or"].append({sort: None})
+            query = {"$and": [query, keyset]} if query else keyset
+
+        direction = 1 if ascending else -1
+        cursor = self.collection.find(query, USER_PUBLIC_PROJECTION) \
+            .sort(_sort_spec(sort, direction)) \
+            .limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def iter_users(
+        self, sort: str = "created_at", ascending: bool = False, **filters
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams every matching projected user document, one driver batch at a time."""
+        direction = 1 if ascending else -1
+        cursor = self.collection.find(_user_filter(**filters), USER_PUBLIC_PROJECTION) \
+            .sort(_sort_spec(sort, direction)) \
+            .batch_size(500)
+        async for doc in cursor:
+            yield doc
 
     async def get_user_by_id(self, user_id: str) -> Optional[UserPublic]:
         if not ObjectId.is_valid(user_id):
@@ -78,16 +192,113 @@ class UserRepository:
         if not update_doc:
             return await self.get_user_by_id(user_id)
         
-        result = await self.collection.update_one(
+        # Single round-trip: apply the update and get the new document back
+        doc = await self.collection.find_one_and_update(
             {"_id": ObjectId(user_id)},
-            {"$set": update_doc}
+            {"$set": update_doc},
+            projection=USER_PUBLIC_PROJECTION,
+            return_document=ReturnDocument.AFTER,
         )
-        if result.modified_count == 1:
-            return await self.get_user_by_id(user_id)
-        return None
+        self._invalidate_principal(user_id)
+        return to_public(doc) if doc else None
 
     async def delete_user(self, user_id: str) -> bool:
         if not ObjectId.is_valid(user_id):
             return False
         result = await self.collection.delete_one({"_id": ObjectId(user_id)})
-        return result.deleted_count == 1
\ No newline at end of file
+        self._invalidate_principal(user_id)
+        return result.deleted_count == 1
+
+    # Bulk admin operations: one unordered bulk_write per batch, results per input item
+    async def bulk_create_users(self, users: List[UserCreate], role: UserRole = 'user') -> List[Dict[str, Any]]:
+        from security.auth import get_password_hashes_async
+
+        # Every hash is done before anything is written; items the pool turned away
+        # are reported as errors instead of failing the request halfway
+        hashes = await get_password_hashes_async([user.password for user in users])
+        now = datetime.utcnow()
+        docs, doc_items = [], []
+        results: Dict[int, Dict[str, Any]] = {}
+        for index, (user_data, hashed_password) in enumerate(zip(users, hashes)):
+            if isinstance(hashed_password, Exception):
+                detail = getattr(hashed_password, "detail", None) or "Password hashing failed"
+                results[index] = {"index": index, "status": "error", "detail": detail}
+                continue
+            doc = UserInDB(
+                **user_data.model_dump(exclude={'password'}),
+                hashed_password=hashed_password,
+                role=role,
+                created_at=now,
+            ).model_dump(by_alias=True, exclude_none=True)
+            doc["_id"] = ObjectId()
+            docs.append(doc)
+            doc_items.append(index)
+
+        errors, _ = await _bulk_write(self.collection, [InsertOne(doc) for doc in docs])
+        for op_index, (index, doc) in enumerate(zip(doc_items, docs)):
+            if op_index in errors:
+                results[index] = {"index": index, "status": "error", "detail": errors[op_index]}
+            else:
+                results[index] = {"index": index, "id": str(doc["_id"]), "status": "created", "user": to_public(doc)}
+        return [results[index] for index in range(len(users))]
+
+    async def bulk_update_users(self, items: List[BulkUserUpdateItem]) -> List[Dict[str, Any]]:
+        results: Dict[int, Dict[str, Any]] = {}
+        operations, op_items = [], []
+        for index, item in enumerate(items):
+            update_doc = item.model_dump(exclude={'id'}, exclude_none=True)
+            if not ObjectId.is_valid(item.id):
+                results[index] = {"index": index, "id": item.id, "status": "error", "detail": "Invalid user id"}
+            elif not update_doc:
+                results[index] = {"index": index, "id": item.id, "status": "error", "detail": "Nothing to update"}
+            else:
+                operations.append(UpdateOne({"_id": ObjectId(item.id)}, {"$set": update_doc}))
+                op_items.append(index)
+
+        errors, matched = await _bulk_write(self.collection, operations)
+        # bulk_write only reports how many matched. When some did not, one _id-only
+        # lookup finds which; the usual all-found case is a single round trip.
+        existing = None
+        if matched < len(operations) - len(errors):
+            ids = [ObjectId(items[index].id) for index in op_items]
+            existing = {str(doc["_id"]) async for doc in self.collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        for op_index, index in enumerate(op_items):
+            user_id = items[index].id
+            self._invalidate_principal(user_id)
+            if op_index in errors:
+                results[index] = {"index": index, "id": user_id, "status": "error", "detail": errors[op_index]}
+            elif existing is not None and user_id not in existing:
+                results[index] = {"index": index, "id": user_id, "status": "error", "detail": "User not found"}
+            else:
+                results[index] = {"index": index, "id": user_id, "status": "updated"}
+        return [results[index] for index in range(len(items))]
+
+    async def bulk_delete_users(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        valid = [ObjectId(user_id) for user_id in user_ids if ObjectId.is_valid(user_id)]
+        existing = {str(doc["_id"]) async for doc in self.collection.find({"_id": {"$in": valid}}, {"_id": 1})}
+
+        to_delete = [user_id for user_id in dict.fromkeys(user_ids) if user_id in existing]
+        errors, _ = await _bulk_write(self.collection, [DeleteOne({"_id": ObjectId(user_id)}) for user_id in to_delete])
+        failed = {to_delete[op_index]: message for op_index, message in errors.items()}
+
+        results, seen = [], set()
+        for index, user_id in enumerate(user_ids):
+            if not ObjectId.is_valid(user_id):
+                results.append({"index": index, "id": user_id, "status": "error", "detail": "Invalid user id"})
+            elif user_id in seen:
+                results.append({"index": index, "id": user_id, "status": "error", "detail": "Duplicate id in request"})
+            elif user_id not in existing:
+                results.append({"index": index, "id": user_id, "status": "error", "detail": "User not found"})
+            elif user_id in failed:
+                results.append({"index": index, "id": user_id, "status": "error", "detail": failed[user_id]})
+            else:
+                results.append({"index": index, "id": user_id, "status": "deleted"})
+                self._invalidate_principal(user_id)
+            seen.add(user_id)
+        return results
+
+    def _invalidate_principal(self, user_id: str):
+        """Drops cached logins so changes apply to the user's next request."""
+        from security.auth import principal_cache
+
+        principal_cache.invalidate_user(user_id)
\ No newline at end of file
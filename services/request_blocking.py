@@ -0,0 +1,118 @@
+# services/request_blocking.py
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Dict, List, Optional
+from config.settings import settings
+
+from playwright.async_api import Page, Route, Request, Response
+
+# Typical transfer sizes per resource type. Blocked requests are aborted before any
+# bytes arrive, so the "bytes saved" figure for them is an estimate based on these.
+ESTIMATED_BYTES_BY_TYPE: Dict[str, int] = {
+    "image": 25_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+@dataclass
+class RuleStats:
+    requests: int = 0
+    bytes_saved: int = 0
+
+
+@dataclass
+class BlockingRules:
+    """Allow/deny rules for one scraping source."""
+    name: str
+    block_resource_types: List[str] = field(default_factory=list)
+    block_url_patterns: List[str] = field(default_factory=list)
+    allow_url_patterns: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_settings(cls, prefix: str) -> "BlockingRules":
+        """Builds rules from the <PREFIX>_BLOCK_* / <PREFIX>_ALLOW_* settings."""
+        return cls(
+            name=prefix,
+            block_resource_types=list(getattr(settings, f"{prefix}_BLOCK_RESOURCE_TYPES", [])),
+            block_url_patterns=list(getattr(settings, f"{prefix}_BLOCK_URL_PATTERNS", [])),
+            allow_url_patterns=list(getattr(settings, f"{prefix}_ALLOW_URL_PATTERNS", [])),
+        )
+
+    def match(self, url: str, resource_type: str) -> Optional[str]:
+        """Returns the name of the deny rule that matches, or None if the request may pass."""
+        for pattern in self.allow_url_patterns:
+            if fnmatch(url, pattern):
+                return None
+        if resource_type in self.block_resource_types:
+            return f"type:{resource_type}"
+        for pattern in self.block_url_patterns:
+            if fnmatch(url, pattern):
+                return f"url:{pattern}"
+        return None
+
+
+class RequestBlocker:
+    """Route-interception layer that aborts unwanted requests and counts what it saved."""
+
+    def __init__(self, rules: BlockingRules):
+        self.rules = rules
+        self.stats: Dict[str, RuleStats] = {}
+        self.allowed_requests: int = 0
+        self.allowed_bytes: int = 0
+
+    async def attach(self, page: Page):
+        await page.route("**/*", self._handle_route)
+        page.on("response", self._on_response)
+
+    async def detach(self, page: Page):
+        """Removes the handlers added by attach(), e.g. when the page moves to another source."""
+        page.remove_listener("response", self._on_response)
+        if not page.is_closed():
+            await page.unroute("**/*", self._handle_route)
+
+    async def _handle_route(self, route: Route, request: Request):
+        rule = self.rules.match(request.url, request.resource_type)
+        if rule is None:
+            self.allowed_requests += 1
+            await route.continue_()
+            return
+
+        stats = self.stats.setdefault(rule, RuleStats())
+        stats.requests += 1
+        stats.bytes_saved += ESTIMATED_BYTES_BY_TYPE.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+        await route.abort("blockedbyclient")
+
+    def _on_response(self, response: Response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.allowed_bytes += int(length)
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "source": self.rules.name,
+            "allowed_requests": self.allowed_requests,
+            "allowed_bytes": self.allowed_bytes,
+            "blocked_requests": sum(s.requests for s in self.stats.values()),
+            "estimated_bytes_saved": sum(s.bytes_saved for s in self.stats.values()),
+            "rules": {
+                rule: {"requests": s.requests, "estimated_bytes_saved": s.bytes_saved}
+                for rule, s in sorted(self.stats.items(), key=lambda item: -item[1].bytes_saved)
+            },
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(
+            f"[{report['source']}] blocked {report['blocked_requests']} requests "
+            f"(~{report['estimated_bytes_saved'] / 1024:.0f} KiB saved), "
+            f"allowed {report['allowed_requests']} ({report['allowed_bytes'] / 1024:.0f} KiB)"
+        )
+        for rule, s in report["rules"].items():
+            print(f"    {rule}: {s['requests']} requests, ~{s['estimated_bytes_saved'] / 1024:.0f} KiB")
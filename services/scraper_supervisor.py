@@ -0,0 +1,161 @@
+# services/scraper_supervisor.py
+
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+from config.settings import settings
+from services.frame_codec import Tick
+from services.websocket_manager import ConnectionManager
+from services.tick_buffer import tick_buffer
+from services.shared_tick import shared_tick
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "worker.py")
+
+# The child writes one JSON tick per line to this inherited pipe fd
+TICK_FD_ENV = "SCRAPER_TICK_FD"
+
+
+def attach_tick_pipe(manager: ConnectionManager, fd: int):
+    """Child side: streams every broadcast tick to the supervisor; stops the worker if it goes away."""
+    os.set_blocking(fd, False)
+    dropped = 0
+
+    def write(tick: Tick):
+        nonlocal dropped
+        try:
+            # Lines stay under PIPE_BUF, so each write is all-or-nothing
+            os.write(fd, tick.frame.encode() + b"\n")
+        except BlockingIOError:
+            dropped += 1   # supervisor is behind; the next tick supersedes this one
+        except BrokenPipeError:
+            signal.raise_signal(signal.SIGINT)
+
+    manager.add_frame_listener(write)
+
+
+class ScraperSupervisor:
+    """
+    Runs the scraper as a child process (`worker.py`) so Playwright traffic, page
+    parsing, crashes and leaks stay out of the API process. Ticks stream back over
+    a pipe and are fanned out here exactly like local ticks. If the child exits it
+    is restarted with exponential backoff; a run that stayed up for
+    SCRAPER_RESTART_RESET_SECONDS resets the backoff.
+    """
+
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self.task: Optional[asyncio.Task] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.received: int = 0
+        self.restarts: int = 0
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _deliver(self, data: Dict[str, Any]):
+        try:
+            timestamp = datetime.fromisoformat(data["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            timestamp = datetime.utcnow()
+        if shared_tick.is_publisher:
+            shared_tick.publish(data, timestamp)
+        tick_buffer.add_tick(data.get("price"), data.get("source", "N/A"), timestamp)
+        await self.manager.broadcast(data)
+        self.received += 1
+
+    async def _terminate(self, process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        # SIGINT lets worker.py's finally block flush buffered prices
+        process.send_signal(signal.SIGINT)
+        try:
+            await asyncio.wait_for(process.wait(), timeout=settings.SCRAPER_STOP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _run_once(self) -> int:
+        read_fd, write_fd = os.pipe()
+        # A change-stream deployment keeps publishing through Mongo; otherwise the
+        # child fans out locally, which is where its ticks reach the pipe.
+        fanout = "change_stream" if settings.TICK_FANOUT == "change_stream" else "local"
+        env = {**os.environ, TICK_FD_ENV: str(write_fd), "TICK_FANOUT": fanout, "RUN_SCRAPER": "true"}
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable, WORKER_PATH, env=env, pass_fds=(write_fd,)
+            )
+        except BaseException:
+            # Nothing will read the pipe; run() retries, so do not leak an fd per attempt
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        print(f"Scraper process started (pid {self.process.pid}).")
+
+        # From here on the child exists: stop it however this attempt ends
+        transport = None
+        try:
+            reader = asyncio.StreamReader()
+            pipe = os.fdopen(read_fd, "rb", 0)
+            try:
+                transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+                    lambda: asyncio.StreamReaderProtocol(reader), pipe
+                )
+            except BaseException:
+                pipe.close()
+                raise
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break   # child exited or closed the pipe
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                await self._deliver(data)
+            return await self.process.wait()
+        finally:
+            if transport is not None:
+                transport.close()
+            await self._terminate(self.process)
+
+    async def run(self):
+        backoff = 1.0
+        while True:
+            started = time.monotonic()
+            try:
+                code = await self._run_once()
+                reason = f"exited with code {code}"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                reason = f"failed: {e}"
+            if time.monotonic() - started > settings.SCRAPER_RESTART_RESET_SECONDS:
+                backoff = 1.0
+            delay = backoff * random.uniform(1.0, 1.5)
+            print(f"Scraper process {reason}; restarting in {delay:.1f}s.")
+            self.restarts += 1
+            await asyncio.sleep(delay)
+            backoff = min(settings.SCRAPER_RESTART_MAX_BACKOFF_SECONDS, backoff * 2)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": self.process.pid if self.process and self.process.returncode is None else None,
+            "received": self.received,
+            "restarts": self.restarts,
+        }
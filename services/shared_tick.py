@@ -0,0 +1,205 @@
+# services/shared_tick.py
+
+import asyncio
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config.settings import settings
+from services.change_detector import parse_price
+from services.tick_buffer import tick_buffer
+
+# Fixed layout, little-endian:
+#   header  @0  : magic, layout version, seqlock counter (odd while a write is in progress)
+#   payload @16 : tick sequence, epoch timestamp, price, price text, source, symbol,
+#                 and rolling UTC-day stats (tick count, open, high, low)
+HEADER = struct.Struct("<4sIQ")
+PAYLOAD = struct.Struct("<Qdd32s48s16sQddd")
+PAYLOAD_OFFSET = HEADER.size
+SEGMENT_SIZE = PAYLOAD_OFFSET + PAYLOAD.size
+MAGIC = b"GTCK"
+LAYOUT_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _segment_path() -> str:
+    if settings.SHM_PATH:
+        return settings.SHM_PATH
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "gold_price_tick")
+
+
+def _text(value: bytes) -> str:
+    return value.rstrip(b"\0").decode("utf-8", "replace")
+
+
+class SharedTickChannel:
+    """
+    Same-host fan-out for `uvicorn --workers N`. One worker holds an flock on the
+    segment's lock file, runs the scraper and publishes every tick into a
+    fixed-layout mmap segment. The other workers poll the segment without locks
+    using the seqlock counter and broadcast to their own clients when the tick
+    sequence advances. If the publisher dies its lock is released and the next
+    worker to retry the lock takes over scraping.
+    """
+
+    def __init__(self):
+        self.path = _segment_path()
+        self._lock_fd: Optional[int] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._reader: Optional[asyncio.Task] = None
+        self.is_publisher = False
+        self.last_seen_seq: int = 0
+        # Writer-side rolling stats
+        self._tick_seq: int = 0
+        self._day: Optional[str] = None
+        self._count = 0
+        self._open = self._high = self._low = 0.0
+
+    # --- Segment ---
+    def _open_segment(self) -> mmap.mmap:
+        if self._mm is None:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if os.fstat(fd).st_size < SEGMENT_SIZE:
+                    os.ftruncate(fd, SEGMENT_SIZE)
+                self._mm = mmap.mmap(fd, SEGMENT_SIZE)
+            finally:
+                os.close(fd)
+        return self._mm
+
+    def _try_lead(self) -> bool:
+        import fcntl  # POSIX only; the deploy targets are Linux
+
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        self.is_publisher = True
+
+        # Carry on from the previous publisher's sequence and day stats
+        snapshot = self.read()
+        if snapshot:
+            self._tick_seq = snapshot["seq"]
+            day = snapshot["timestamp"].date().isoformat()
+            if day == datetime.utcnow().date().isoformat():
+                stats = snapshot["stats"]
+                self._day, self._count = day, stats["count"]
+                self._open, self._high, self._low = stats["open"], stats["high"], stats["low"]
+        return True
+
+    # --- Writer ---
+    def publish(self, tick: Dict[str, Any], timestamp: datetime):
+        value = parse_price(tick.get("price"))
+        if value is None or not self.is_publisher:
+            return
+        day = timestamp.date().isoformat()
+        if day != self._day:
+            self._day, self._count = day, 0
+            self._open = self._high = self._low = value
+        self._count += 1
+        self._high = max(self._high, value)
+        self._low = min(self._low, value)
+        self._tick_seq += 1
+
+        mm = self._open_segment()
+        _, _, version = HEADER.unpack_from(mm, 0)
+        HEADER.pack_into(mm, 0, MAGIC, LAYOUT_VERSION, version + 1)   # odd: write in progress
+        PAYLOAD.pack_into(
+            mm, PAYLOAD_OFFSET,
+            self._tick_seq,
+            (timestamp - _EPOCH).total_seconds(),
+            value,
+            str(tick.get("price", "")).encode()[:32],
+            str(tick.get("source", "")).encode()[:48],
+            str(tick.get("symbol", "")).encode()[:16],
+            self._count, self._open, self._high, self._low,
+        )
+        HEADER.pack_into(mm, 0, MAGIC, LAYOUT_VERSION, version + 2)   # even: consistent
+
+    # --- Reader ---
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Lock-free snapshot of the segment, or None if it is empty or mid-write too long."""
+        mm = self._open_segment()
+        for _ in range(100):
+            magic, layout, before = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or layout != LAYOUT_VERSION:
+                return None
+            if before & 1:
+                continue
+            fields = PAYLOAD.unpack_from(mm, PAYLOAD_OFFSET)
+            _, _, after = HEADER.unpack_from(mm, 0)
+            if before == after:
+                seq, ts, price, text, source, symbol, count, day_open, high, low = fields
+                return {
+                    "seq": seq,
+                    "timestamp": _EPOCH + timedelta(seconds=ts),
+                    "price_value": price,
+                    "price": _text(text),
+                    "source": _text(source),
+                    "symbol": _text(symbol),
+                    "stats": {"count": count, "open": day_open, "high": high, "low": low},
+                }
+        return None
+
+    async def _read_loop(self, manager, on_leadership: Callable[[], Awaitable[None]]):
+        retry_every = max(1, int(settings.SHM_LEADER_RETRY_SECONDS / settings.SHM_POLL_INTERVAL_SECONDS))
+        polls = 0
+        while True:
+            await asyncio.sleep(settings.SHM_POLL_INTERVAL_SECONDS)
+            snapshot = self.read()
+            if snapshot and snapshot["seq"] != self.last_seen_seq:
+                self.last_seen_seq = snapshot["seq"]
+                newest = tick_buffer.newest()
+                # The buffer is kept in time order for its binary searches
+                if newest is None or snapshot["timestamp"] >= newest:
+                    tick_buffer.append(snapshot["timestamp"], snapshot["price_value"], snapshot["source"])
+                await manager.broadcast({
+                    "price": snapshot["price"],
+                    "source": snapshot["source"],
+                    "symbol": snapshot["symbol"],
+                    "timestamp": snapshot["timestamp"].isoformat(),
+                })
+
+            polls += 1
+            if polls % retry_every == 0 and self._try_lead():
+                print(f"Worker {os.getpid()} took over as tick publisher.")
+                await on_leadership()
+                return
+
+    async def start(self, manager, on_leadership: Callable[[], Awaitable[None]]):
+        """Publishes if this worker wins the lock, otherwise follows the segment."""
+        self._open_segment()
+        if self._try_lead():
+            print(f"Worker {os.getpid()} is the tick publisher.")
+            await on_leadership()
+        else:
+            print(f"Worker {os.getpid()} follows the shared tick segment.")
+            # The segment outlives restarts: whatever it holds now was published
+            # before this worker started (and is in the seeded buffer if it was
+            # saved), so only later sequences are rebroadcast
+            snapshot = self.read()
+            if snapshot:
+                self.last_seen_seq = snapshot["seq"]
+            self._reader = asyncio.create_task(self._read_loop(manager, on_leadership))
+
+    async def stop(self):
+        if self._reader:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)   # releases the flock
+            self._lock_fd = None
+            self.is_publisher = False
+
+
+shared_tick = SharedTickChannel()
@@ -0,0 +1,68 @@
+# services/sse_hub.py
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Set, Tuple
+from config.settings import settings
+from services.frame_codec import Tick
+
+
+class SseHub:
+    """
+    Server-Sent Events fan-out. Each tick is formatted into one `id/event/data`
+    block of bytes that every subscriber shares. The last SSE_REPLAY_EVENTS
+    blocks are kept so a client reconnecting with Last-Event-ID gets what it missed.
+    Event ids are the tick's epoch milliseconds, so they mean the same thing on
+    every replica and across restarts, and a client can resume behind any of them.
+    """
+
+    def __init__(self, replay_size: int):
+        self.last_id: int = 0
+        self.recent: Deque[Tuple[int, bytes]] = deque(maxlen=replay_size)
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, tick: Tick):
+        """Called by ConnectionManager.broadcast with the tick and its already-encoded JSON frame."""
+        # Ids must keep increasing: two ticks in the same millisecond, or one stamped
+        # earlier than the last, take the next free id
+        event_id = max(tick.time_ms or 0, self.last_id + 1)
+        self.last_id = event_id
+        block = f"id: {event_id}\nevent: price\ndata: {tick.frame}\n\n".encode()
+        self.recent.append((event_id, block))
+        for queue in self.subscribers:
+            if queue.full():
+                # Slow reader: drop its oldest event, latest price wins
+                queue.get_nowait()
+            queue.put_nowait(block)
+
+    def _replay(self, last_event_id: Optional[str]) -> List[bytes]:
+        latest = [self.recent[-1][1]] if self.recent else []
+        try:
+            last = int(last_event_id) if last_event_id is not None else None
+        except ValueError:
+            last = None
+        if last is None or not self.recent or last > self.recent[-1][0]:
+            # New client, or an id newer than anything this replica has seen yet
+            return latest
+        return [block for event_id, block in self.recent if event_id > last]
+
+    async def stream(self, last_event_id: Optional[str], is_disconnected) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SSE_CLIENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            yield f"retry: {settings.SSE_RETRY_MS}\n\n".encode()
+            for block in self._replay(last_event_id):
+                yield block
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        break
+                    # Comment line: keeps proxies and load balancers from idling us out
+                    yield b": keep-alive\n\n"
+        finally:
+            self.subscribers.discard(queue)
+
+
+sse_hub = SseHub(settings.SSE_REPLAY_EVENTS)
@@ -0,0 +1,139 @@
+# services/tick_buffer.py
+
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from config.settings import settings
+from services.change_detector import parse_price
+from motor.motor_asyncio import AsyncIOMotorClient as MongoClient
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(timestamp: datetime) -> float:
+    return (timestamp - _EPOCH).total_seconds()
+
+
+class TickRingBuffer:
+    """
+    Fixed-capacity ring of recent ticks stored column-wise in typed arrays
+    (8-byte timestamp, 8-byte price, 2-byte source id per tick), so memory is
+    preallocated once and never grows. Ticks are appended in time order, which
+    lets window reads binary-search the timestamps.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.timestamps = array('d', bytes(8 * self.capacity))
+        self.prices = array('d', bytes(8 * self.capacity))
+        self.source_ids = array('H', bytes(2 * self.capacity))
+        self.source_names: List[str] = []
+        self._source_index: Dict[str, int] = {}
+        self.head: int = 0      # next write position
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.timestamps, self.prices, self.source_ids))
+
+    def _source_id(self, source: str) -> int:
+        source_id = self._source_index.get(source)
+        if source_id is None:
+            source_id = len(self.source_names)
+            self.source_names.append(source)
+            self._source_index[source] = source_id
+        return source_id
+
+    def append(self, timestamp: datetime, price: float, source: str):
+        i = self.head
+        self.timestamps[i] = _to_epoch(timestamp)
+        self.prices[i] = price
+        self.source_ids[i] = self._source_id(source)
+        self.head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def add_tick(self, price: str, source: str, timestamp: datetime):
+        """Appends a scraped tick; non-numeric prices are skipped."""
+        value = parse_price(price)
+        if value is not None:
+            self.append(timestamp, value, source)
+
+    # --- Reads ---
+    def newest(self) -> Optional[datetime]:
+        """Timestamp of the most recent tick, or None while empty."""
+        if not self.size:
+            return None
+        return _EPOCH + timedelta(seconds=self.timestamps[(self.head - 1) % self.capacity])
+
+    def _physical(self, logical: int) -> int:
+        """Maps 0..size-1 (oldest to newest) onto the ring."""
+        return (self.head - self.size + logical) % self.capacity
+
+    def _row(self, logical: int) -> Dict[str, Any]:
+        i = self._physical(logical)
+        return {
+            "timestamp": _EPOCH + timedelta(seconds=self.timestamps[i]),
+            "price": self.prices[i],
+            "source": self.source_names[self.source_ids[i]],
+        }
+
+    def _first_at_or_after(self, epoch: float) -> int:
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._physical(mid)] < epoch:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def last(self, n: int, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest `n` ticks, oldest first."""
+        if source is None:
+            return [self._row(i) for i in range(max(0, self.size - n), self.size)]
+        source_id = self._source_index.get(source)
+        rows: List[Dict[str, Any]] = []
+        logical = self.size - 1
+        while logical >= 0 and len(rows) < n:
+            if self.source_ids[self._physical(logical)] == source_id:
+                rows.append(self._row(logical))
+            logical -= 1
+        rows.reverse()
+        return rows
+
+    def window(self, since: datetime, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All ticks at or after `since`, oldest first."""
+        start = self._first_at_or_after(_to_epoch(since))
+        source_id = self._source_index.get(source) if source is not None else None
+        return [
+            self._row(i) for i in range(start, self.size)
+            if source is None or self.source_ids[self._physical(i)] == source_id
+        ]
+
+    def sparkline(self, since: datetime, points: int, source: Optional[str] = None) -> List[float]:
+        """Window prices downsampled to at most `points` values (last price of each slot)."""
+        prices = [row["price"] for row in self.window(since, source)]
+        if len(prices) <= points:
+            return prices
+        step = len(prices) / points
+        return [prices[min(len(prices) - 1, int((k + 1) * step) - 1)] for k in range(points)]
+
+    # --- Startup ---
+    async def seed(self, client: MongoClient, price_repo) -> int:
+        """Loads the last TICK_BUFFER_SECONDS of ticks from Mongo."""
+        since = datetime.utcnow() - timedelta(seconds=settings.TICK_BUFFER_SECONDS)
+        loaded = 0
+        async for doc in price_repo.iter_prices_since(client, since):
+            value = parse_price(doc.get("price"))
+            if value is None:
+                continue
+            self.append(doc["timestamp"], value, doc.get("source", "N/A"))
+            loaded += 1
+        print(f"Tick buffer seeded with {loaded} ticks ({self.nbytes() // 1024} KiB reserved).")
+        return loaded
+
+
+tick_buffer = TickRingBuffer(settings.TICK_BUFFER_CAPACITY)
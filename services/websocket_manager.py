@@ -48,42 +48,368 @@
 
 # services/websocket_manager.py
 
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
 from fastapi import WebSocket
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple, Union
 from datetime import datetime
+from config.settings import settings
+from services.frame_codec import MAX_STREAMS, Tick, negotiate, encode_json as encode_frame
+
+RATE_ERROR = {"type": "error", "detail": "max_updates_per_second must be a finite number above 0, or null."}
+
+
+class ClientConnection:
+    """
+    One WebSocket plus its bounded outbound queue and writer task. Price frames
+    are conflated per (source, symbol) stream (a newer tick replaces an unsent
+    older one), so a slow client skips stale prices instead of building a backlog.
+    Clients on a compact encoding get ticks as binary frames, delta-encoded
+    against the last tick actually sent to them on that stream.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", encoding: str = "json"):
+        self.websocket = websocket
+        self.manager = manager
+        self.encoding = encoding
+        self.delta_base: Dict[int, Tuple[int, int]] = {}
+        self.pending: "OrderedDict[Any, Union[str, Tick]]" = OrderedDict()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self._seq = 0
+        # Lag counters
+        self.sent: int = 0
+        self.bytes_sent: int = 0
+        self.conflated: int = 0
+        self.dropped: int = 0
+        self.behind_since: Optional[float] = None
+        self.throttled = False   # writer is waiting out the client's requested rate
+        # Subscription state (everything, unthrottled, until the client asks otherwise)
+        self.sources: Optional[Set[str]] = None
+        self.symbols: Optional[Set[str]] = None
+        self.excluded_sources: Set[str] = set()
+        self.excluded_symbols: Set[str] = set()
+        self.min_interval: float = 0.0
+        self.last_tick_sent_at: float = float("-inf")
+        self.uses_protocol = False
+        self.last_seen = time.monotonic()
+
+    def wants(self, data: Dict[str, Any]) -> bool:
+        """True if a tick matches this client's subscription."""
+        source, symbol = data.get("source"), data.get("symbol")
+        if source in self.excluded_sources or symbol in self.excluded_symbols:
+            return False
+        if self.sources is not None and source not in self.sources:
+            return False
+        if self.symbols is not None and symbol not in self.symbols:
+            return False
+        return True
+
+    def start(self):
+        self.writer = asyncio.create_task(self._write_loop())
+
+    def enqueue_tick(self, tick: Tick) -> bool:
+        """Queues a price tick in this client's encoding, conflated by (source, symbol)."""
+        frame = tick if self.encoding != "json" and tick.compactable else tick.frame
+        return self.enqueue(frame, key=("tick", tick.data.get("source"), tick.data.get("symbol")))
+
+    def enqueue(self, frame: Union[str, Tick], key: Any = None) -> bool:
+        """Queues a frame; returns False if the client has been behind for too long."""
+        if self.closed:
+            return False
+        now = time.monotonic()
+        # Lag is "queue not drained since the last send"; waiting out a requested rate is not lag
+        if self.pending and not self.throttled:
+            if self.behind_since is None:
+                self.behind_since = now
+            elif now - self.behind_since > settings.WS_CLIENT_MAX_LAG_SECONDS:
+                return False
+
+        if key is None:
+            # Control/one-off frames are never conflated
+            self._seq += 1
+            key = ("seq", self._seq)
+        if key in self.pending:
+            self.conflated += 1
+            del self.pending[key]
+        elif len(self.pending) >= settings.WS_CLIENT_QUEUE_SIZE:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[key] = frame
+        self.ready.set()
+        return True
+
+    @staticmethod
+    def _is_control(key: Any) -> bool:
+        return isinstance(key, tuple) and key[0] == "seq"
+
+    def _tick_delay(self) -> float:
+        """Seconds until the client's requested rate allows the next tick."""
+        if not self.min_interval:
+            return 0.0
+        return self.last_tick_sent_at + self.min_interval - time.monotonic()
+
+    def _next_key(self) -> Optional[Any]:
+        """
+        Control frames go out first and immediately; the oldest queued tick goes out
+        once the client's rate allows it. None when nothing may be sent yet.
+        """
+        tick_key = None
+        for key in self.pending:
+            if self._is_control(key):
+                return key
+            if tick_key is None:
+                tick_key = key
+        if tick_key is not None and self._tick_delay() <= 0:
+            return tick_key
+        return None
+
+    async def _write_loop(self):
+        try:
+            while True:
+                self.ready.clear()
+                key = self._next_key()
+                if key is None:
+                    # Ticks held back by the requested rate conflate in the queue meanwhile;
+                    # a control frame arriving sooner wakes the writer
+                    self.throttled = bool(self.pending)
+                    try:
+                        await asyncio.wait_for(
+                            self.ready.wait(), timeout=self._tick_delay() if self.throttled else None
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                self.throttled = False
+                frame = self.pending.pop(key)
+                if isinstance(frame, Tick):
+                    payload = frame.encode(self.encoding, self.delta_base.get(frame.stream_id))
+                    send = self.websocket.send_bytes(payload)
+                else:
+                    payload = frame
+                    send = self.websocket.send_text(frame)
+                await asyncio.wait_for(send, timeout=settings.WS_SEND_TIMEOUT_SECONDS)
+                if isinstance(frame, Tick):
+                    self.delta_base[frame.stream_id] = frame.state
+                if not self._is_control(key):
+                    self.last_tick_sent_at = time.monotonic()
+                self.sent += 1
+                self.bytes_sent += len(payload)
+                self.behind_since = None
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send failed or timed out; drop the client
+            self.manager.disconnect(self.websocket)
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+
+    # --- Control protocol ---
+    def _set_filter(self, include: Optional[Set[str]], exclude: Set[str], values, subscribe: bool):
+        if values in (None, []):
+            return include
+        if values == "*" or values == ["*"]:
+            exclude.clear()
+            return None if subscribe else set()
+        values = set(values)
+        if subscribe:
+            exclude.difference_update(values)
+            return values if include is None else include | values
+        exclude.update(values)
+        return include if include is None else include - values
+
+    def handle_message(self, raw: str) -> Dict[str, Any]:
+        """
+        Applies one control message and returns the reply. Messages:
+        {"type": "subscribe" | "unsubscribe", "sources": [...], "symbols": [...]},
+        {"type": "rate", "max_updates_per_second": 1.5}, {"type": "ping"}, {"type": "pong"}.
+        """
+        self.uses_protocol = True
+        try:
+            message = json.loads(raw)
+            kind = message.get("type")
+        except (ValueError, AttributeError):
+            return {"type": "error", "detail": "Messages must be JSON objects with a 'type'."}
+
+        if kind == "ping":
+            return {"type": "pong", "timestamp": datetime.utcnow().isoformat()}
+        if kind == "pong":
+            return {}
+        if kind in ("subscribe", "unsubscribe"):
+            subscribe = kind == "subscribe"
+            for field in ("sources", "symbols"):
+                values = message.get(field)
+                if values not in (None, "*") and not (
+                    isinstance(values, (list, tuple)) and all(isinstance(v, str) for v in values)
+                ):
+                    return {"type": "error", "detail": f"'{field}' must be a list of strings or '*'."}
+            min_interval = self.min_interval
+            if "max_updates_per_second" in message:
+                min_interval = self._min_interval(message["max_updates_per_second"])
+                if min_interval is None:
+                    return RATE_ERROR
+            # Validated first, so an invalid message leaves the subscription unchanged
+            self.sources = self._set_filter(self.sources, self.excluded_sources, message.get("sources"), subscribe)
+            self.symbols = self._set_filter(self.symbols, self.excluded_symbols, message.get("symbols"), subscribe)
+            self.min_interval = min_interval
+            return self.subscription()
+        if kind == "rate":
+            return self._set_rate(message.get("max_updates_per_second"))
+        return {"type": "error", "detail": f"Unknown message type '{kind}'."}
+
+    @staticmethod
+    def _min_interval(rate: Any) -> Optional[float]:
+        """Seconds between ticks for a requested rate (null lifts the limit); None if invalid."""
+        if rate is None:
+            return 0.0
+        if isinstance(rate, bool):
+            return None
+        try:
+            rate = float(rate)
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(rate) or rate <= 0:
+            return None
+        # Cap the interval so a throttled subscription never goes quiet for too long
+        return min(1.0 / rate, settings.WS_MIN_UPDATE_RATE_INTERVAL)
+
+    def _set_rate(self, rate: Any) -> Dict[str, Any]:
+        min_interval = self._min_interval(rate)
+        if min_interval is None:
+            return RATE_ERROR
+        self.min_interval = min_interval
+        return self.subscription()
+
+    def subscription(self) -> Dict[str, Any]:
+        return {
+            "type": "subscription",
+            "sources": sorted(self.sources) if self.sources is not None else "*",
+            "symbols": sorted(self.symbols) if self.symbols is not None else "*",
+            "excluded_sources": sorted(self.excluded_sources),
+            "excluded_symbols": sorted(self.excluded_symbols),
+            "max_updates_per_second": round(1.0 / self.min_interval, 6) if self.min_interval else None,
+        }
+
+    async def close(self):
+        self.closed = True
+        self.pending.clear()
+        if self.writer and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.pending),
+            "encoding": self.encoding,
+            "sent": self.sent,
+            "bytes_sent": self.bytes_sent,
+            "conflated": self.conflated,
+            "dropped": self.dropped,
+            "behind_seconds": round(time.monotonic() - self.behind_since, 3) if self.behind_since else 0.0,
+            "throttled": self.throttled,
+        }
+
 
 class ConnectionManager:
     def __init__(self):
         # Stores active WebSocket connections
         self.active_connections: List[WebSocket] = []
+        self.clients: Dict[WebSocket, ClientConnection] = {}
         self.last_broadcasted_data: Dict[str, Any] = {}
+        self.last_tick: Optional[Tick] = None
+        self.stream_ids: Dict[Tuple[Any, Any], int] = {}
+        self.evicted_slow: int = 0
+        # Other transports (e.g. SSE) that reuse the encoded tick
+        self.frame_listeners: List[Callable[[Tick], None]] = []
+
+    def add_frame_listener(self, listener: Callable[[Tick], None]):
+        self.frame_listeners.append(listener)
+
+    def _stream_id(self, data: Dict[str, Any]) -> Optional[int]:
+        """
+        Small id per (source, symbol), used by compact frames instead of the names.
+        Ids are never reused: once the table is full, new streams get None and their
+        ticks go out as JSON, so no client decodes a delta against another stream.
+        """
+        key = (data.get("source"), data.get("symbol"))
+        stream_id = self.stream_ids.get(key)
+        if stream_id is None and len(self.stream_ids) < MAX_STREAMS:
+            stream_id = self.stream_ids[key] = len(self.stream_ids)
+        return stream_id
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+        encoding, subprotocol = negotiate(
+            websocket.scope.get("subprotocols"), websocket.query_params.get("encoding")
+        )
+        await websocket.accept(subprotocol=subprotocol)
+        client = ClientConnection(websocket, self, encoding)
         self.active_connections.append(websocket)
-        print("New WebSocket client connected")
-        await websocket.send_json({"price": None, "source": None, "timestamp": datetime.now().isoformat()})
-        
-        if self.last_broadcasted_data:
-            await websocket.send_json(self.last_broadcasted_data)
+        self.clients[websocket] = client
+        client.start()
+        print(f"New WebSocket client connected ({encoding})")
+        client.enqueue(encode_frame({"price": None, "source": None, "timestamp": datetime.now().isoformat()}))
 
+        if self.last_tick:
+            client.enqueue_tick(self.last_tick)
 
     async def broadcast(self, data: dict):
         self.last_broadcasted_data = data
-        to_remove = []
-        for conn in self.active_connections:
-            try:
-                await conn.send_json(data)
-            except:
-                to_remove.append(conn)
-        for conn in to_remove:
-            self.disconnect(conn)
+        # Encode once and hand the tick to every client's queue; the writers do the I/O,
+        # so the scraper loop never waits on a slow socket
+        tick = Tick(data, self._stream_id(data))
+        self.last_tick = tick
+        for listener in self.frame_listeners:
+            listener(tick)
+        lagging = [
+            ws for ws, client in self.clients.items()
+            if client.wants(data) and not client.enqueue_tick(tick)
+        ]
+        for ws in lagging:
+            self.evicted_slow += 1
+            print(f"Evicting client that stayed behind for over {settings.WS_CLIENT_MAX_LAG_SECONDS}s.")
+            await self.evict(ws)
+
+    async def evict(self, websocket: WebSocket):
+        """Disconnects a client and closes its socket."""
+        client = self.clients.get(websocket)
+        self.disconnect(websocket)
+        if client:
+            await client.close()
 
     def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client:
+            client.closed = True
+            if client.writer and client.writer is not asyncio.current_task():
+                client.writer.cancel()
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-        print(f"Client disconnected. Total active: {len(self.active_connections)}")
+            print(f"Client disconnected. Total active: {len(self.active_connections)}")
 
+    def stats(self, per_client: bool = False) -> Dict[str, Any]:
+        clients = [c.stats() for c in self.clients.values()]
+        stats = {
+            "clients": len(clients),
+            "queued": sum(c["queued"] for c in clients),
+            "bytes_sent": sum(c["bytes_sent"] for c in clients),
+            "conflated": sum(c["conflated"] for c in clients),
+            "dropped": sum(c["dropped"] for c in clients),
+            "max_behind_seconds": max((c["behind_seconds"] for c in clients), default=0.0),
+            "evicted_slow": self.evicted_slow,
+        }
+        if per_client:
+            stats["per_client"] = clients
+        return stats
 
-manager = ConnectionManager()
 
+manager = ConnectionManager()
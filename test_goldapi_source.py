@@ -0,0 +1,39 @@
+import asyncio
+
+from services.goldapi_source import GoldApiSource
+
+
+class CountingUsageRepo:
+    def __init__(self, usage):
+        self.usage = usage
+        self.reads = 0
+
+    async def get_usage(self, client, month):
+        self.reads += 1
+        return self.usage
+
+    async def claim_request(self, client, month, used, now):
+        return True
+
+
+def test_locally_denied_requests_skip_the_usage_read():
+    source = GoldApiSource()
+    source.mongo_client = object()
+    source.usage_repo = CountingUsageRepo({"used": source.budget.monthly_quota})
+    source.budget.load(source.usage_repo.usage)
+
+    async def five_polls():
+        return [await source._acquire() for _ in range(5)]
+
+    results = asyncio.run(five_polls())
+    assert results == [False] * 5
+    assert source.usage_repo.reads == 0
+
+
+def test_allowed_requests_are_checked_against_the_shared_count():
+    source = GoldApiSource()
+    source.mongo_client = object()
+    source.usage_repo = CountingUsageRepo({"used": 0})
+
+    assert asyncio.run(source._acquire())
+    assert source.usage_repo.reads == 1
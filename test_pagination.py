@@ -0,0 +1,29 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from api.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_datetime_and_id():
+    doc_id = ObjectId()
+    timestamp = datetime(2026, 1, 5, 12, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(timestamp, doc_id), datetime.fromisoformat) == (timestamp, doc_id)
+
+
+def test_cursor_keeps_pipes_in_the_value():
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor("a|b@example.com", doc_id)) == ("a|b@example.com", doc_id)
+
+
+def test_missing_value_gives_an_id_only_cursor():
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor(None, doc_id), datetime.fromisoformat) == (None, doc_id)
+
+
+def test_garbage_cursor_is_a_400():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
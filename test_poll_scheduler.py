@@ -0,0 +1,102 @@
+import asyncio
+from datetime import date, datetime, timezone
+
+import pytest
+
+from services.poll_scheduler import MarketCalendar, PollScheduler
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def spot_gold(**kwargs):
+    # Sunday 18:00 to Friday 17:00 New York time, closed 17:00-18:00 on weekdays
+    return MarketCalendar("America/New_York", "Sun 18:00", "Fri 17:00", "17:00-18:00", **kwargs)
+
+
+def test_next_open_after_the_weekly_close_is_sunday_evening():
+    # Friday 2026-01-09 17:30 EST
+    assert spot_gold().next_open(utc(2026, 1, 9, 22, 30)) == utc(2026, 1, 11, 23, 0)
+
+
+def test_next_open_after_the_daily_break():
+    # Tuesday 2026-01-13 17:15 EST
+    calendar = spot_gold()
+    assert calendar.next_open(utc(2026, 1, 13, 22, 15)) == utc(2026, 1, 13, 23, 0)
+    assert calendar.seconds_until_open(utc(2026, 1, 13, 22, 15)) == 45 * 60
+
+
+def test_next_open_is_now_while_open():
+    now = utc(2026, 1, 14, 15, 0, 30)
+    assert spot_gold().next_open(now) == now
+
+
+def test_holidays_close_the_whole_local_day():
+    calendar = spot_gold(holidays={date(2026, 1, 19)})
+    # Monday 2026-01-19 10:00 EST -> Tuesday 00:00 EST
+    assert calendar.next_open(utc(2026, 1, 19, 15, 0)) == utc(2026, 1, 20, 5, 0)
+
+
+def test_unknown_time_zone_is_an_error_not_utc():
+    with pytest.raises(ValueError):
+        MarketCalendar("Not/A_Zone", "Sun 18:00", "Fri 17:00")
+
+
+def test_disabled_calendar_is_always_open():
+    assert spot_gold(enabled=False).is_open(utc(2026, 1, 10, 12, 0))
+
+
+def scheduler():
+    return PollScheduler("test", base_interval=2.0, min_interval=0.5, max_interval=30.0,
+                         target_move_bps=1.0, window=10, backoff_base=1.0, backoff_max=60.0)
+
+
+def test_backoff_is_bounded_after_a_long_outage():
+    poller = scheduler()
+    for _ in range(5000):
+        poller.record_failure()
+    assert 30.0 <= poller.next_delay() <= 60.0
+
+
+def test_success_resets_failures_and_uses_the_base_interval_until_warmed_up():
+    poller = scheduler()
+    poller.record_failure()
+    poller.record_success("2000.00", now=0.0)
+    assert poller.failures == 0
+    assert poller.next_delay() == 2.0
+
+
+class StopLoop(Exception):
+    pass
+
+
+def test_budget_denial_waits_for_the_budget_without_backing_off(monkeypatch):
+    from services import playwright_scraper_service as scraper_module
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) >= 3:
+            raise StopLoop
+
+    async def denied_fetch():
+        return None, None
+
+    async def always_open(_key):
+        pass
+
+    monkeypatch.setattr(scraper_module.asyncio, "sleep", fake_sleep)
+    service = object.__new__(scraper_module.PlaywrightGoldScrapingService)
+    service.schedulers = {}
+    service._wait_for_market = always_open
+
+    try:
+        asyncio.run(service._poll_forever(
+            "GOLDAPI", denied_fetch, None, min_wait=lambda: 3600.0, budget_denied=lambda: True,
+        ))
+    except StopLoop:
+        pass
+    assert service.schedulers["GOLDAPI"].failures == 0
+    assert sleeps == [3600.0, 3600.0, 3600.0]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from services.repositories.price_write_buffer import DUPLICATE_KEY_ERROR, PriceWriteBuffer
+
+
+class FakeCollection:
+    """insert_many stand-in that stores documents and fails on demand."""
+
+    def __init__(self):
+        self.docs = []
+        self.errors = []   # exceptions (or callables building one from the batch) to raise, in order
+
+    async def insert_many(self, docs, ordered=True):
+        if self.errors:
+            error = self.errors.pop(0)
+            raise error(docs) if callable(error) else error
+        self.docs.extend(docs)
+
+
+def make_buffer(collection, max_batch=10, max_pending=100):
+    return PriceWriteBuffer(lambda _client: collection, max_batch=max_batch,
+                            max_age_seconds=60, max_pending=max_pending)
+
+
+def test_flush_writes_in_batches():
+    async def run():
+        collection = FakeCollection()
+        buffer = make_buffer(collection, max_batch=2)
+        for i in range(5):
+            buffer.add(object(), {"price": str(i)})
+        assert await buffer.flush()
+        await buffer.close()
+        return collection, buffer
+
+    collection, buffer = asyncio.run(run())
+    assert [d["price"] for d in collection.docs] == ["0", "1", "2", "3", "4"]
+    assert buffer.stats()["written"] == 5
+    assert buffer.stats()["pending"] == 0
+
+
+def test_partial_bulk_error_retries_only_failed_documents():
+    def partial_failure(docs):
+        # Document 1 failed, document 2 was a duplicate, the rest were stored
+        collection.docs.extend([docs[0], docs[3]])
+        return BulkWriteError({"writeErrors": [
+            {"index": 1, "code": 1},
+            {"index": 2, "code": DUPLICATE_KEY_ERROR},
+        ]})
+
+    async def run():
+        buffer = make_buffer(collection)
+        for i in range(4):
+            buffer.add(object(), {"price": str(i)})
+        assert not await buffer.flush()
+        assert [d["price"] for d in buffer._pending] == ["1"]
+        assert await buffer.flush()
+        await buffer.close()
+        return buffer
+
+    collection = FakeCollection()
+    collection.errors.append(partial_failure)
+    buffer = asyncio.run(run())
+    assert sorted(d["price"] for d in collection.docs) == ["0", "1", "3"]
+    assert buffer.written == 3
+    assert buffer.failed_flushes == 1
+
+
+def test_failed_batch_is_requeued_and_oldest_dropped_past_max_pending():
+    async def run():
+        collection = FakeCollection()
+        collection.errors.append(AutoReconnect("down"))
+        buffer = make_buffer(collection, max_batch=2, max_pending=3)
+        for i in range(5):
+            buffer.add(object(), {"price": str(i)})
+        assert not await buffer.flush()
+        pending = [d["price"] for d in buffer._pending]
+        await buffer.close()
+        return buffer, pending
+
+    buffer, pending = asyncio.run(run())
+    assert pending == ["2", "3", "4"]
+    assert buffer.dropped == 2
+
+
+def test_add_after_close_raises():
+    async def run():
+        collection = FakeCollection()
+        buffer = make_buffer(collection)
+        buffer.add(object(), {"price": "1"})
+        await buffer.close()
+        with pytest.raises(RuntimeError):
+            buffer.add(object(), {"price": "2"})
+        return collection, buffer
+
+    collection, buffer = asyncio.run(run())
+    assert [d["price"] for d in collection.docs] == ["1"]
+    assert buffer._task is None
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from services import scraper_supervisor as supervisor_module
+from services.scraper_supervisor import ScraperSupervisor
+from services.websocket_manager import ConnectionManager
+
+
+def is_open(fd):
+    try:
+        os.fstat(fd)
+        return True
+    except OSError:
+        return False
+
+
+def test_failed_spawn_closes_both_pipe_ends(monkeypatch):
+    fds = []
+    real_pipe = os.pipe
+
+    def recording_pipe():
+        pair = real_pipe()
+        fds.extend(pair)
+        return pair
+
+    async def failing_spawn(*args, **kwargs):
+        raise OSError(12, "Cannot allocate memory")
+
+    monkeypatch.setattr(supervisor_module.os, "pipe", recording_pipe)
+    monkeypatch.setattr(supervisor_module.asyncio, "create_subprocess_exec", failing_spawn)
+
+    with pytest.raises(OSError):
+        asyncio.run(ScraperSupervisor(ConnectionManager())._run_once())
+    assert len(fds) == 2
+    assert not any(is_open(fd) for fd in fds)
+
+
+def test_child_ticks_reach_the_parent_through_the_pipe():
+    async def run():
+        read_fd, write_fd = os.pipe()
+        child, parent = ConnectionManager(), ConnectionManager()
+        supervisor_module.attach_tick_pipe(child, write_fd)
+        tick = {"price": "2,650.10", "source": "GOLDAPI", "symbol": "XAU",
+                "timestamp": datetime.utcnow().isoformat()}
+        try:
+            await child.broadcast(tick)
+            os.set_blocking(read_fd, False)
+            line = os.read(read_fd, 65536)
+            await ScraperSupervisor(parent)._deliver(json.loads(line))
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        return tick, line, parent
+
+    tick, line, parent = asyncio.run(run())
+    # One JSON line per tick, as the supervisor's readline() expects
+    assert line.endswith(b"\n") and line.count(b"\n") == 1
+    assert parent.last_broadcasted_data == tick
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from security import auth
+from security.auth import PasswordHashPool, PrincipalCache
+
+
+def user(user_id="u1"):
+    return SimpleNamespace(id=user_id)
+
+
+def at(monkeypatch, now):
+    monkeypatch.setattr(auth.time, "time", lambda: now)
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl_seconds=30)
+    at(monkeypatch, 1000.0)
+    cache.put("token", user(), token_exp=None)
+    at(monkeypatch, 1029.0)
+    assert cache.get("token") is not None
+    at(monkeypatch, 1030.0)
+    assert cache.get("token") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1}
+
+
+def test_entry_never_outlives_the_token(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl_seconds=300)
+    at(monkeypatch, 1000.0)
+    cache.put("token", user(), token_exp=1010.0)
+    at(monkeypatch, 1010.0)
+    assert cache.get("token") is None
+
+
+def test_invalidate_user_drops_all_of_their_tokens(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl_seconds=300)
+    at(monkeypatch, 1000.0)
+    cache.put("a", user("u1"), None)
+    cache.put("b", user("u1"), None)
+    cache.put("c", user("u2"), None)
+    cache.invalidate_user("u1")
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    cache = PrincipalCache(max_entries=2, ttl_seconds=300)
+    at(monkeypatch, 1000.0)
+    cache.put("a", user("u1"), None)
+    cache.put("b", user("u2"), None)
+    cache.get("a")
+    cache.put("c", user("u3"), None)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_password_pool_rejects_calls_past_max_queue():
+    async def run():
+        pool = PasswordHashPool(workers=1, max_queue=1)
+        release = threading.Event()
+        running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        pool.shutdown()
+        return pool, rejected.value
+
+    pool, rejected = asyncio.run(run())
+    assert rejected.status_code == 503
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 2
+
+
+def test_password_pool_map_holds_at_most_workers_slots():
+    async def run():
+        pool = PasswordHashPool(workers=2, max_queue=0)
+        results = await pool.map(lambda x: x * 2, range(8))
+        pool.shutdown()
+        return pool, results
+
+    pool, results = asyncio.run(run())
+    assert results == [x * 2 for x in range(8)]
+    assert pool.peak_in_flight == 2
+    assert pool.rejected == 0
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from models.user import BulkUserUpdateItem
+from services.repositories.user_repo import UserRepository
+
+
+class FakeUsers:
+    """Users collection stand-in that counts round trips."""
+
+    def __init__(self, ids):
+        self.ids = set(ids)
+        self.calls = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append("bulk_write")
+        matched = sum(1 for op in operations if op._filter["_id"] in self.ids)
+        return SimpleNamespace(matched_count=matched)
+
+    def find(self, query, projection=None):
+        self.calls.append("find")
+        docs = [{"_id": _id} for _id in query["_id"]["$in"] if _id in self.ids]
+
+        async def cursor():
+            for doc in docs:
+                yield doc
+        return cursor()
+
+
+def repo_with(collection):
+    client = SimpleNamespace(get_database=lambda _name: SimpleNamespace(get_collection=lambda _name: collection))
+    return UserRepository(client)
+
+
+def test_bulk_update_is_one_round_trip_when_every_user_exists():
+    ids = [ObjectId(), ObjectId()]
+    collection = FakeUsers(ids)
+    items = [BulkUserUpdateItem(id=str(_id), country="CA") for _id in ids]
+    results = asyncio.run(repo_with(collection).bulk_update_users(items))
+    assert [r["status"] for r in results] == ["updated", "updated"]
+    assert collection.calls == ["bulk_write"]
+
+
+def test_bulk_update_reports_missing_users():
+    present, missing = ObjectId(), ObjectId()
+    collection = FakeUsers([present])
+    items = [
+        BulkUserUpdateItem(id=str(missing), country="CA"),
+        BulkUserUpdateItem(id=str(present), country="CA"),
+        BulkUserUpdateItem(id="nope", country="CA"),
+    ]
+    results = asyncio.run(repo_with(collection).bulk_update_users(items))
+    assert [(r["status"], r.get("detail")) for r in results] == [
+        ("error", "User not found"), ("updated", None), ("error", "Invalid user id"),
+    ]
+    assert collection.calls == ["bulk_write", "find"]
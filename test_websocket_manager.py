@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+from services.frame_codec import Tick
+from services.websocket_manager import ClientConnection, ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self):
+        pass
+
+
+def tick(price, source="IG.com", symbol="XAU/USD", stream_id=0):
+    return Tick({"price": price, "source": source, "symbol": symbol,
+                 "timestamp": "2026-01-05T12:00:00"}, stream_id)
+
+
+def test_newer_tick_conflates_older_one_on_the_same_stream():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    client.enqueue_tick(tick("2000.00"))
+    client.enqueue_tick(tick("2001.00"))
+    assert list(client.pending.values()) == [tick("2001.00").frame]
+    assert client.conflated == 1
+
+
+def test_symbols_of_one_source_do_not_conflate_each_other():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    client.enqueue_tick(tick("2000.00", symbol="XAU/USD"))
+    client.enqueue_tick(tick("25.00", symbol="XAG/USD", stream_id=1))
+    assert len(client.pending) == 2
+    assert client.conflated == 0
+
+
+def test_string_filter_values_are_rejected():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    reply = client.handle_message(json.dumps({"type": "subscribe", "sources": "IG.com"}))
+    assert reply["type"] == "error"
+    assert client.sources is None
+
+
+def test_subscribe_to_listed_sources():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    reply = client.handle_message(json.dumps({"type": "subscribe", "sources": ["IG.com"]}))
+    assert reply["sources"] == ["IG.com"]
+    assert client.wants({"source": "IG.com", "symbol": "XAU/USD"})
+    assert not client.wants({"source": "GoldAPI.io", "symbol": "XAU/USD"})
+
+
+def test_non_finite_or_non_positive_rates_are_rejected():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    for rate in ("nan", "inf", 0, -1, True, "fast"):
+        reply = client.handle_message(json.dumps({"type": "rate", "max_updates_per_second": rate}))
+        assert reply["type"] == "error", rate
+        assert client.min_interval == 0.0
+
+
+def test_rate_sets_interval_and_null_lifts_it():
+    client = ClientConnection(FakeWebSocket(), manager=None)
+    reply = client.handle_message(json.dumps({"type": "rate", "max_updates_per_second": 2}))
+    assert client.min_interval == 0.5
+    assert reply["max_updates_per_second"] == 2.0
+    client.handle_message(json.dumps({"type": "rate", "max_updates_per_second": None}))
+    assert client.min_interval == 0.0
+
+
+def test_control_frames_skip_the_tick_rate_limit():
+    async def run():
+        websocket = FakeWebSocket()
+        client = ClientConnection(websocket, manager=None)
+        client.min_interval = 60.0
+        client.start()
+        client.enqueue_tick(tick("2000.00"))
+        await asyncio.sleep(0.05)
+        # The next tick waits out the interval; a pong does not
+        client.enqueue_tick(tick("2001.00"))
+        client.enqueue('{"type":"pong"}')
+        await asyncio.sleep(0.05)
+        await client.close()
+        return websocket.sent
+
+    sent = asyncio.run(run())
+    assert sent == [tick("2000.00").frame, '{"type":"pong"}']
+
+
+def test_broadcast_encodes_once_for_every_client():
+    manager = ConnectionManager()
+    clients = [ClientConnection(FakeWebSocket(), manager) for _ in range(3)]
+    for client in clients:
+        manager.clients[client.websocket] = client
+    heard = []
+    manager.add_frame_listener(heard.append)
+
+    asyncio.run(manager.broadcast({"price": "2000.00", "source": "IG.com", "symbol": "XAU/USD",
+                                   "timestamp": "2026-01-05T12:00:00"}))
+    frames = [next(iter(client.pending.values())) for client in clients]
+    assert all(frame is heard[0].frame for frame in frames)
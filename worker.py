@@ -1,9 +1,25 @@
 # worker.py
+#
+# Standalone scraper process. Also the child entry point for SCRAPER_PROCESS=subprocess:
+# the supervising API process passes a pipe fd in SCRAPER_TICK_FD and receives every
+# published tick on it as one JSON line.
 import asyncio
 import os
+import signal
 from core.database import connect_to_mongo, get_mongo_client, close_mongo_connection
 from services.playwright_scraper_service import PlaywrightGoldScrapingService as GoldScrapingService
 from services.repositories.price_repo import PriceRepository
+from services.scraper_supervisor import TICK_FD_ENV, attach_tick_pipe
+from services.websocket_manager import manager as ws_manager
+
+
+async def watch_parent(parent_pid: int):
+    """Exits when the supervisor dies, even if no tick is written to notice the broken pipe."""
+    while os.getppid() == parent_pid:
+        await asyncio.sleep(5)
+    print("Supervisor gone; stopping scraper worker.")
+    signal.raise_signal(signal.SIGINT)
+
 
 async def run_worker():
     # connect to DB
@@ -12,17 +28,24 @@ async def run_worker():
     price_repo = PriceRepository()
     scraper = GoldScrapingService(repo=price_repo)
 
-    # If your scraper exposes run_scraper_loop_async(mongo_client) like in main.py:
-    await scraper.run_scraper_loop_async(mongo_client)
+    tick_fd = os.environ.get(TICK_FD_ENV)
+    watchdog = None
+    if tick_fd:
+        attach_tick_pipe(ws_manager, int(tick_fd))
+        watchdog = asyncio.create_task(watch_parent(os.getppid()))
+
+    try:
+        await scraper.run_scraper_loop_async(mongo_client)
+    finally:
+        # Runs on Ctrl+C / cancellation too, so buffered prices are not lost
+        if watchdog:
+            watchdog.cancel()
+        await scraper.close(mongo_client)
+        await price_repo.flush()
+        await close_mongo_connection()
 
 if __name__ == "__main__":
     try:
         asyncio.run(run_worker())
     except KeyboardInterrupt:
         print("Worker stopped")
-    finally:
-        # best-effort to close DB
-        try:
-            asyncio.run(close_mongo_connection())
-        except Exception:
-            pass